@@ -0,0 +1,126 @@
+"""
+Filename: _numba_kernels.py
+
+Description:
+    Numba kernels for speaker embedding matching.
+    Compiled loops that score utterance embeddings against reference
+    embeddings without materializing the full (N, M) similarity matrix.
+    Callers must check HAVE_NUMBA and fall back to the NumPy path.
+
+Usage:
+    from askthegame.speaker._numba_kernels import HAVE_NUMBA, best_cosine_match
+
+    if HAVE_NUMBA:
+        indices, scores = best_cosine_match(utterances, references)
+        voiceprint = avg_normalize(sample_embeddings)
+        ids, scores = cosine_topk(unit_queries, unit_references, k=3)
+
+Created: 2026-10-15
+"""
+
+import math
+
+import numpy as np
+
+try:
+    import numba as nb
+except ImportError:  # pragma: no cover - numba is optional
+    nb = None
+
+HAVE_NUMBA = nb is not None
+
+
+def best_cosine_match(utts, refs):
+    """Return the most similar reference row and its cosine score for every utterance row."""
+    n_utts, dim = utts.shape
+    n_refs = refs.shape[0]
+    indices = np.empty(n_utts, dtype=np.int64)
+    scores = np.empty(n_utts, dtype=np.float32)
+
+    # Reference norms are shared by every utterance, so compute them once
+    ref_norms = np.empty(n_refs, dtype=np.float64)
+    for j in nb.prange(n_refs):
+        acc = 0.0
+        for k in range(dim):
+            acc += refs[j, k] * refs[j, k]
+        ref_norms[j] = math.sqrt(acc) if acc > 0.0 else 1.0
+
+    for i in nb.prange(n_utts):
+        acc = 0.0
+        for k in range(dim):
+            acc += utts[i, k] * utts[i, k]
+        utt_norm = math.sqrt(acc) if acc > 0.0 else 1.0
+
+        best, best_j = -2.0, 0
+        for j in range(n_refs):
+            dot = 0.0
+            for k in range(dim):
+                dot += utts[i, k] * refs[j, k]
+            score = dot / (utt_norm * ref_norms[j])
+            if score > best:
+                best, best_j = score, j
+        indices[i] = best_j
+        scores[i] = best
+
+    return indices, scores
+
+
+def avg_normalize(embeddings):
+    """Return the L2-normalized mean of the rows of a (N, D) matrix."""
+    n_rows, dim = embeddings.shape
+    mean = np.zeros(dim, dtype=np.float32)
+    for i in range(n_rows):
+        for k in range(dim):
+            mean[k] += embeddings[i, k]
+
+    acc = 0.0
+    for k in range(dim):
+        mean[k] /= n_rows
+        acc += mean[k] * mean[k]
+    if acc > 0.0:
+        norm = math.sqrt(acc)
+        for k in range(dim):
+            mean[k] /= norm
+    return mean
+
+
+def cosine_topk(queries, bank, k):
+    """
+    Return the k best bank rows per query, best first, for unit-normalized inputs.
+
+    Keeps a sorted k-slot buffer per query instead of sorting all M scores.
+    """
+    n_queries, dim = queries.shape
+    n_bank = bank.shape[0]
+    indices = np.empty((n_queries, k), dtype=np.int64)
+    scores = np.empty((n_queries, k), dtype=np.float32)
+
+    for i in nb.prange(n_queries):
+        top_ids = np.full(k, -1, dtype=np.int64)
+        top_scores = np.full(k, -np.inf, dtype=np.float32)
+        for j in range(n_bank):
+            dot = 0.0
+            for d in range(dim):
+                dot += queries[i, d] * bank[j, d]
+            if dot <= top_scores[k - 1]:
+                continue
+            # Insertion into the sorted buffer
+            slot = k - 1
+            while slot > 0 and top_scores[slot - 1] < dot:
+                top_scores[slot] = top_scores[slot - 1]
+                top_ids[slot] = top_ids[slot - 1]
+                slot -= 1
+            top_scores[slot] = dot
+            top_ids[slot] = j
+        indices[i] = top_ids
+        scores[i] = top_scores
+
+    return indices, scores
+
+
+if HAVE_NUMBA:
+    best_cosine_match = nb.njit(parallel=True, fastmath=True, cache=True)(
+        best_cosine_match
+    )
+    avg_normalize = nb.njit(fastmath=True, cache=True)(avg_normalize)
+    cosine_topk = nb.njit(parallel=True, fastmath=True, cache=True)(cosine_topk)
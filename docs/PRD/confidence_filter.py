@@ -20,11 +20,136 @@ Last Updated: 2025-06-27
 
 import json
 import logging
-import statistics
+import math
+import os
 import time
+from array import array
+from collections import Counter
 from datetime import datetime
-from pathlib import Path
-from typing import Dict, List, Any, Tuple, Optional
+from itertools import islice
+from typing import Dict, List, Any, Tuple, Optional, NamedTuple, Union, Iterable, Iterator
+
+import numpy as np
+
+try:
+    import numba as nb
+except ImportError:  # pragma: no cover - numba is optional
+    nb = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+# Decision/reason codes shared by the batched classification kernel
+DECISIONS = ("passed", "flagged", "dropped")
+REASONS = ("high_confidence", "medium_confidence", "low_confidence",
+           "too_few_words", "excessive_duration", "empty_segment",
+           "no_confidence_data", "evaluation_error")
+DECISION_CODES = {decision: code for code, decision in enumerate(DECISIONS)}
+REASON_CODES = {reason: code for code, reason in enumerate(REASONS)}
+METHOD_CODES = {"average": 0, "weighted": 1, "median": 2, "percentile": 3}
+
+# Segments per kernel call when a streamed iterable is batched
+STREAM_BATCH_SIZE = 256
+
+
+class FilterResult(NamedTuple):
+    """Compact per-segment filter outcome, indexed like the input segments."""
+    decisions: np.ndarray    # int8 codes into DECISIONS
+    reasons: np.ndarray      # int8 codes into REASONS
+    confidences: np.ndarray  # float32, NaN where no score was calculated
+
+
+def _flatten_segments(segments: List[Dict[str, Any]]) -> Tuple[np.ndarray, ...]:
+    """
+    Flatten segments into contiguous arrays for batched classification.
+    
+    Returns:
+        Tuple of (conf_flat, dur_flat, offsets, starts, ends) where the words of
+        segment i live in conf_flat[offsets[i]:offsets[i + 1]]
+    """
+    n_segments = len(segments)
+    offsets = np.zeros(n_segments + 1, dtype=np.int64)
+    starts = np.empty(n_segments, dtype=np.float64)
+    ends = np.empty(n_segments, dtype=np.float64)
+    confs, durs = [], []
+    
+    for i, segment in enumerate(segments):
+        words = segment.get('words') or []
+        starts[i] = segment.get('start', 0.0)
+        ends[i] = segment.get('end', 0.0)
+        offsets[i + 1] = offsets[i] + len(words)
+        for word in words:
+            conf = word.get('confidence')
+            if conf is None:
+                # Treat missing confidence as 0.0 with minimum duration
+                confs.append(0.0)
+                durs.append(0.01)
+            else:
+                confs.append(conf)
+                durs.append(word.get('end', 0.0) - word.get('start', 0.0))
+    
+    conf_flat = np.clip(np.asarray(confs, dtype=np.float64), 0.0, 1.0)
+    dur_flat = np.maximum(np.asarray(durs, dtype=np.float64), 0.01)
+    return conf_flat, dur_flat, offsets, starts, ends
+
+
+def _classify_segments(conf_flat, dur_flat, offsets, starts, ends,
+                       high, low, min_words, min_words_high, short_threshold,
+                       max_duration, method_code):
+    """Compute per-segment confidence, decision and reason codes."""
+    n_segments = starts.shape[0]
+    decisions = np.empty(n_segments, dtype=np.int8)
+    reasons = np.empty(n_segments, dtype=np.int8)
+    scores = np.empty(n_segments, dtype=np.float64)
+    
+    for i in nb.prange(n_segments):
+        lo, hi = offsets[i], offsets[i + 1]
+        word_count = hi - lo
+        if word_count == 0:
+            decisions[i], reasons[i], scores[i] = 2, 5, np.nan
+            continue
+        
+        # Cheap rejections that do not need a confidence score
+        if word_count < min_words and word_count < min_words_high:
+            decisions[i], reasons[i], scores[i] = 1, 3, np.nan
+            continue
+        if word_count >= min_words and ends[i] - starts[i] > max_duration:
+            decisions[i], reasons[i], scores[i] = 1, 4, np.nan
+            continue
+        
+        confs = conf_flat[lo:hi]
+        if method_code == 1:
+            durs = dur_flat[lo:hi]
+            score = np.sum(confs * durs) / np.sum(durs)
+        elif method_code == 2:
+            score = np.median(confs)
+        elif method_code == 3:
+            k = int(0.25 * word_count)
+            # np.partition returns a new array, so conf_flat is left untouched
+            score = np.partition(confs, k)[k]
+        else:
+            score = np.sum(confs) / word_count
+        scores[i] = score
+        
+        if word_count < min_words and not (word_count >= min_words_high and score >= short_threshold):
+            decisions[i], reasons[i] = 1, 3
+        elif ends[i] - starts[i] > max_duration:
+            decisions[i], reasons[i] = 1, 4
+        elif score >= high:
+            decisions[i], reasons[i] = 0, 0
+        elif score >= low:
+            decisions[i], reasons[i] = 1, 1
+        else:
+            decisions[i], reasons[i] = 2, 2
+    
+    return decisions, reasons, scores
+
+
+if nb is not None:
+    _classify_segments = nb.njit(parallel=True, fastmath=True, cache=True)(_classify_segments)
 
 
 class ConfidenceFilterConfig:
@@ -79,8 +204,17 @@ class ConfidenceFilter:
         self.config = config or ConfidenceFilterConfig()
         self.logger = logging.getLogger(__name__)
         
+        # Bind the confidence calculation once; the method is fixed for the run
+        self._calc_conf = {
+            "average": self._calc_avg,
+            "weighted": self._calc_weighted,
+            "median": self._calc_median,
+            "percentile": self._calc_p25,
+        }[self.config.confidence_method]
+        
         # Create output directory
-        Path(self.config.output_dir).mkdir(parents=True, exist_ok=True)
+        self._output_dir = str(self.config.output_dir)
+        os.makedirs(self._output_dir, exist_ok=True)
         
         # Stats for reporting
         self.stats = {
@@ -88,289 +222,466 @@ class ConfidenceFilter:
             "passed": 0,
             "flagged": 0,
             "dropped": 0,
-            "confidence_scores": [],
+            "confidence_scores": np.empty(0, dtype=np.float32),
             "processing_start": None,
             "processing_duration": 0.0,
-            "flagged_reasons": {},
-            "dropped_reasons": {}
+            "flagged_reasons": Counter(),
+            "dropped_reasons": Counter()
         }
     
-    def filter_segments(self, segments: List[Dict[str, Any]], 
+    def filter_segments(self, segments: Iterable[Dict[str, Any]], 
                        episode_id: Optional[str] = None,
-                       save_results: bool = True) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+                       save_results: bool = True,
+                       return_metadata: bool = True) -> Union[Tuple[List[Dict], List[Dict], List[Dict]], FilterResult]:
         """
         Filter segments based on confidence scores.
         
         Args:
-            segments: List of segments to filter
+            segments: List of segments to filter; any iterable when return_metadata
+                is False, consumed in a single streaming pass
             episode_id: Optional episode identifier for output files
             save_results: Whether to save results to files
+            return_metadata: Return metadata-augmented segment copies. When False,
+                only a compact FilterResult is built and no result files are saved
             
         Returns:
-            Tuple of (passed_segments, flagged_segments, dropped_segments)
+            Tuple of (passed_segments, flagged_segments, dropped_segments),
+            or a FilterResult when return_metadata is False
+        """
+        if not return_metadata:
+            self.stats["processing_start"] = time.time()
+            return self._collect_codes(evaluation for _, evaluation in self._evaluations(segments))
+        
+        results = self.iter_filter_segments(segments)
+        if save_results:
+            results = self.save_results(results, episode_id)
+        
+        buckets = {"passed": [], "flagged": [], "dropped": []}
+        for decision, segment_with_meta in results:
+            buckets[decision].append(segment_with_meta)
+        passed, flagged, dropped = buckets["passed"], buckets["flagged"], buckets["dropped"]
+        
+        self.logger.info(f"Filtered {len(segments)} segments: "
+                       f"{len(passed)} passed, {len(flagged)} flagged, {len(dropped)} dropped")
+        
+        return passed, flagged, dropped
+    
+    def iter_filter_segments(self, segments: Iterable[Dict[str, Any]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Lazily filter segments, yielding each one as soon as it is classified.
+        
+        Lets callers stream results to disk or a downstream queue without holding
+        every metadata-augmented copy in memory. Stats are updated as segments are
+        consumed and finalized when the iterator is exhausted or closed.
+        
+        Args:
+            segments: Iterable of segments to filter
+            
+        Yields:
+            Tuple of (decision, segment_with_meta)
         """
         self.stats["processing_start"] = time.time()
-        self.stats["total_segments"] = len(segments)
+        self.stats["total_segments"] = 0
         
-        passed, flagged, dropped = [], [], []
+        # Compact float32 storage for confidence scores
+        conf_buf = array('f')
+        
+        # All segments in a batch share the time the batch was filtered
+        filter_timestamp = datetime.now().isoformat()
         
         try:
-            for segment in segments:
-                decision, reason, confidence_score = self._evaluate_segment(segment)
+            for segment, (decision, reason, confidence_score) in self._evaluations(segments):
+                self.stats["total_segments"] += 1
+                
+                # Track decision and reasons
+                self.stats[decision] += 1
+                if decision != "passed":
+                    self.stats[f"{decision}_reasons"][reason] += 1
+                
+                # Track confidence for statistics
+                if confidence_score is not None:
+                    conf_buf.append(confidence_score)
                 
                 # Add decision metadata to segment
-                segment_with_meta = segment.copy()
-                segment_with_meta.update({
+                yield decision, {
+                    **segment,
                     "filter_decision": decision,
                     "filter_reason": reason,
                     "calculated_confidence": confidence_score,
-                    "filter_timestamp": datetime.now().isoformat()
-                })
-                
-                # Route to appropriate bucket and track reasons
-                if decision == "passed":
-                    passed.append(segment_with_meta)
-                    self.stats["passed"] += 1
-                elif decision == "flagged":
-                    flagged.append(segment_with_meta)
-                    self.stats["flagged"] += 1
-                    # Track flagged reasons
-                    self.stats["flagged_reasons"][reason] = self.stats["flagged_reasons"].get(reason, 0) + 1
-                else:  # dropped
-                    dropped.append(segment_with_meta)
-                    self.stats["dropped"] += 1
-                    # Track dropped reasons
-                    self.stats["dropped_reasons"][reason] = self.stats["dropped_reasons"].get(reason, 0) + 1
-                
-                # Track confidence for statistics
-                if confidence_score is not None:
-                    self.stats["confidence_scores"].append(confidence_score)
-            
+                    "filter_timestamp": filter_timestamp
+                }
+        finally:
+            self.stats["confidence_scores"] = np.concatenate(
+                (self.stats["confidence_scores"], np.frombuffer(conf_buf, dtype=np.float32))
+            )
             self.stats["processing_duration"] = time.time() - self.stats["processing_start"]
-            
-            self.logger.info(f"Filtered {len(segments)} segments: "
-                           f"{len(passed)} passed, {len(flagged)} flagged, {len(dropped)} dropped")
-            
-            # Save results if requested
-            if save_results:
-                self._save_results(passed, flagged, dropped, episode_id)
-            
-            return passed, flagged, dropped
-            
+    
+    def _evaluations(self, segments: Iterable[Dict[str, Any]]) -> Iterable[Tuple[Dict[str, Any], Tuple]]:
+        """
+        Pair each segment with its (decision, reason, confidence_score) evaluation.
+        
+        Lists are batched through the Numba kernel when available, and other
+        iterables are batched in windows of STREAM_BATCH_SIZE so they are still
+        consumed lazily. Without Numba segments are evaluated one at a time.
+        """
+        # Read config once rather than per segment
+        thresholds = self._thresholds()
+        
+        if nb is None:
+            return self._evaluate_each(segments, thresholds)
+        if isinstance(segments, list):
+            evaluations = self._evaluate_batch(segments, thresholds)
+            if evaluations is not None:
+                return zip(segments, evaluations)
+            return self._evaluate_each(segments, thresholds)
+        return self._evaluate_windows(iter(segments), thresholds)
+    
+    def _evaluate_windows(self, segments: Iterator[Dict[str, Any]], thresholds: Tuple):
+        """Yield (segment, evaluation) pairs, batching a stream through the kernel window by window."""
+        while window := list(islice(segments, STREAM_BATCH_SIZE)):
+            evaluations = self._evaluate_batch(window, thresholds)
+            if evaluations is None:
+                yield from self._evaluate_each(window, thresholds)
+            else:
+                yield from zip(window, evaluations)
+    
+    def _collect_codes(self, evaluations: Iterable[Tuple[str, str, Optional[float]]]) -> FilterResult:
+        """Record evaluations into compact arrays and update stats without copying segments."""
+        decision_buf, reason_buf, conf_buf = array('b'), array('b'), array('f')
+        for decision, reason, confidence_score in evaluations:
+            decision_buf.append(DECISION_CODES[decision])
+            reason_buf.append(REASON_CODES[reason])
+            conf_buf.append(math.nan if confidence_score is None else confidence_score)
+        
+        decisions = np.asarray(decision_buf, dtype=np.int8)
+        reasons = np.asarray(reason_buf, dtype=np.int8)
+        confidences = np.asarray(conf_buf, dtype=np.float32)
+        self.stats["total_segments"] = len(decisions)
+        
+        counts = np.bincount(decisions, minlength=len(DECISIONS)).tolist()
+        for decision, count in zip(DECISIONS, counts):
+            self.stats[decision] += count
+        for (decision, reason), count in Counter(zip(decisions.tolist(), reasons.tolist())).items():
+            if decision == DECISION_CODES["flagged"]:
+                self.stats["flagged_reasons"][REASONS[reason]] += count
+            elif decision == DECISION_CODES["dropped"]:
+                self.stats["dropped_reasons"][REASONS[reason]] += count
+        
+        self.stats["confidence_scores"] = np.concatenate(
+            (self.stats["confidence_scores"], confidences[~np.isnan(confidences)])
+        )
+        self.stats["processing_duration"] = time.time() - self.stats["processing_start"]
+        
+        self.logger.info(f"Filtered {len(decisions)} segments: "
+                         f"{counts[0]} passed, {counts[1]} flagged, {counts[2]} dropped")
+        
+        return FilterResult(decisions, reasons, confidences)
+    
+    def _thresholds(self) -> Tuple[float, float, int, int, float, float]:
+        """
+        Snapshot the config values used to classify segments.
+        
+        Returns:
+            Tuple of (high_threshold, low_threshold, min_words, min_words_high_confidence,
+            short_segment_confidence_threshold, max_duration)
+        """
+        cfg = self.config
+        return (cfg.high_threshold, cfg.low_threshold, cfg.min_words,
+                cfg.min_words_high_confidence, cfg.short_segment_confidence_threshold,
+                cfg.max_duration)
+    
+    def _evaluate_batch(self, segments: List[Dict[str, Any]],
+                        thresholds: Tuple) -> Optional[List[Tuple[str, str, Optional[float]]]]:
+        """
+        Evaluate all segments at once with the Numba classification kernel.
+        
+        Returns:
+            List of (decision, reason, confidence_score) tuples, or None if the
+            segments could not be flattened (caller falls back to per-segment evaluation)
+        """
+        try:
+            arrays = _flatten_segments(segments)
         except Exception as e:
-            self.logger.error(f"Confidence filtering failed: {e}", exc_info=True)
-            # Return original segments as passed on failure
-            return segments, [], []
+            self.logger.debug(f"Batched evaluation unavailable, using per-segment path: {e}")
+            return None
+        
+        decisions, reasons, scores = _classify_segments(
+            *arrays, *thresholds, METHOD_CODES[self.config.confidence_method]
+        )
+        
+        return [
+            (DECISIONS[d], REASONS[r], None if math.isnan(score) else score)
+            for d, r, score in zip(decisions.tolist(), reasons.tolist(), scores.tolist())
+        ]
     
-    def _evaluate_segment(self, segment: Dict[str, Any]) -> Tuple[str, str, Optional[float]]:
+    def _evaluate_each(self, segments: Iterable[Dict[str, Any]], thresholds: Tuple):
+        """Yield (segment, evaluation) pairs, dropping segments that fail to evaluate."""
+        for index, segment in enumerate(segments):
+            try:
+                yield segment, self._evaluate_segment(segment, thresholds)
+            except Exception as e:
+                self.logger.warning(f"Failed to evaluate segment {index}: {e}")
+                yield segment, ("dropped", "evaluation_error", None)
+    
+    def _evaluate_segment(self, segment: Dict[str, Any],
+                          thresholds: Optional[Tuple] = None) -> Tuple[str, str, Optional[float]]:
         """
         Evaluate a single segment and determine its fate.
         
+        Args:
+            segment: Segment to evaluate
+            thresholds: Precomputed result of _thresholds() (read from config if omitted)
+        
         Returns:
             Tuple of (decision, reason, confidence_score)
         """
-        try:
-            # Extract segment data
-            words = segment.get('words', [])
-            start_time = segment.get('start', 0.0)
-            end_time = segment.get('end', 0.0)
-            duration = end_time - start_time
-            
-            # Edge case: Empty segments
-            if not words:
-                return "dropped", "empty_segment", None
-            
-            # Smart min_words check: Consider confidence for short segments
-            word_count = len(words)
-            confidence_score = self._calculate_confidence(words)
-            
-            if word_count < self.config.min_words:
-                # Allow shorter segments if they have high confidence
-                if (word_count >= self.config.min_words_high_confidence and 
-                    confidence_score is not None and 
-                    confidence_score >= self.config.short_segment_confidence_threshold):
-                    # High confidence short segment gets a pass
-                    pass  # Continue to normal confidence evaluation
-                else:
-                    return "flagged", "too_few_words", confidence_score
-            
-            # Edge case: Very long segments
-            if duration > self.config.max_duration:
-                return "flagged", "excessive_duration", confidence_score
-            
-            # Confidence score already calculated above
-            
-            if confidence_score is None:
-                return "dropped", "no_confidence_data", None
-            
-            # Apply confidence thresholds
-            if confidence_score >= self.config.high_threshold:
-                return "passed", "high_confidence", confidence_score
-            elif confidence_score >= self.config.low_threshold:
-                return "flagged", "medium_confidence", confidence_score
+        high, low, min_words, min_words_high, short_threshold, max_duration = (
+            thresholds or self._thresholds()
+        )
+        
+        # Extract segment data
+        words = segment.get('words', [])
+        start_time = segment.get('start', 0.0)
+        end_time = segment.get('end', 0.0)
+        duration = end_time - start_time
+        
+        # Edge case: Empty segments
+        if not words:
+            return "dropped", "empty_segment", None
+        
+        # Cheap rejections that do not need a confidence score
+        word_count = len(words)
+        if word_count < min_words and word_count < min_words_high:
+            return "flagged", "too_few_words", None
+        if word_count >= min_words and duration > max_duration:
+            return "flagged", "excessive_duration", None
+        
+        # Smart min_words check: Consider confidence for short segments
+        confidence_score = self._calc_conf(words)
+        
+        if word_count < min_words:
+            # Allow shorter segments if they have high confidence
+            if (word_count >= min_words_high and 
+                confidence_score is not None and 
+                confidence_score >= short_threshold):
+                # High confidence short segment gets a pass
+                pass  # Continue to normal confidence evaluation
             else:
-                return "dropped", "low_confidence", confidence_score
-                
-        except Exception as e:
-            self.logger.warning(f"Failed to evaluate segment: {e}")
-            return "dropped", "evaluation_error", None
+                return "flagged", "too_few_words", confidence_score
+        
+        # Edge case: Very long segments
+        if duration > max_duration:
+            return "flagged", "excessive_duration", confidence_score
+        
+        # Confidence score already calculated above
+        
+        if confidence_score is None:
+            return "dropped", "no_confidence_data", None
+        
+        # Apply confidence thresholds
+        if confidence_score >= high:
+            return "passed", "high_confidence", confidence_score
+        elif confidence_score >= low:
+            return "flagged", "medium_confidence", confidence_score
+        else:
+            return "dropped", "low_confidence", confidence_score
     
     def _calculate_confidence(self, words: List[Dict[str, Any]]) -> Optional[float]:
         """Calculate confidence score based on configured method."""
         if not words:
             return None
+        return self._calc_conf(words)
+    
+    @staticmethod
+    def _word_confidences(words: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extract word confidences into a contiguous array (SoA).
         
-        try:
-            # Extract confidence scores, handling missing values
-            confidences = []
-            durations = []
-            
-            for word in words:
-                conf = word.get('confidence')
-                if conf is not None:
-                    # Normalize malformed confidence values
-                    if conf < 0:
-                        conf = 0.0
-                    elif conf > 1.0:
-                        conf = 1.0
-                    confidences.append(conf)
-                    
-                    # Calculate duration for weighted average
-                    start = word.get('start', 0.0)
-                    end = word.get('end', 0.0)
-                    durations.append(max(0.01, end - start))  # Minimum duration
-                else:
-                    # Treat missing confidence as 0.0
-                    confidences.append(0.0)
-                    durations.append(0.01)
-            
-            if not confidences:
-                return None
-            
-            # Calculate based on method
-            if self.config.confidence_method == "average":
-                return sum(confidences) / len(confidences)
-            
-            elif self.config.confidence_method == "weighted":
-                if len(confidences) != len(durations):
-                    return sum(confidences) / len(confidences)  # Fallback
-                
-                weighted_sum = sum(conf * dur for conf, dur in zip(confidences, durations))
-                total_duration = sum(durations)
-                return weighted_sum / total_duration if total_duration > 0 else 0.0
-            
-            elif self.config.confidence_method == "median":
-                return statistics.median(confidences)
-            
-            elif self.config.confidence_method == "percentile":
-                # Use 25th percentile to handle low-confidence outliers
-                sorted_confs = sorted(confidences)
-                index = int(0.25 * len(sorted_confs))
-                return sorted_confs[index]
+        Returns:
+            Tuple of (confidences, missing) where missing confidences are 0.0,
+            malformed values are clipped to [0, 1] and missing is the boolean mask
+        """
+        raw = np.fromiter(
+            (np.nan if (c := word.get('confidence')) is None else c for word in words),
+            dtype=np.float64, count=len(words)
+        )
+        missing = np.isnan(raw)
+        confidences = np.clip(raw, 0.0, 1.0, out=raw)
+        confidences[missing] = 0.0
+        return confidences, missing
+    
+    def _calc_avg(self, words: List[Dict[str, Any]]) -> float:
+        confidences, _ = self._word_confidences(words)
+        return float(confidences.mean())
+    
+    def _calc_weighted(self, words: List[Dict[str, Any]]) -> float:
+        confidences, missing = self._word_confidences(words)
+        durations = np.fromiter(
+            (word.get('end', 0.0) - word.get('start', 0.0) for word in words),
+            dtype=np.float64, count=len(words)
+        )
+        np.maximum(durations, 0.01, out=durations)  # Minimum duration
+        durations[missing] = 0.01
+        total_duration = durations.sum()
+        return float(np.dot(confidences, durations) / total_duration) if total_duration > 0 else 0.0
+    
+    def _calc_median(self, words: List[Dict[str, Any]]) -> float:
+        confidences, _ = self._word_confidences(words)
+        return float(np.median(confidences))
+    
+    def _calc_p25(self, words: List[Dict[str, Any]]) -> float:
+        # Use 25th percentile to handle low-confidence outliers
+        # Quickselect in place on the scratch array instead of sorting
+        confidences, _ = self._word_confidences(words)
+        index = int(0.25 * confidences.size)
+        confidences.partition(index)
+        return float(confidences[index])
+    
+    def save_results(self, results: Iterable[Tuple[str, Dict[str, Any]]],
+                     episode_id: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Stream (decision, segment) pairs into the result files, passing each one on.
+        
+        Wraps iter_filter_segments() output: every segment is appended to its
+        decision's JSON file as it goes by, so no bucket of segments is held in
+        memory, and the text report is written once the stream ends. Write
+        failures are logged and the pairs keep flowing.
+        
+        Args:
+            results: (decision, segment_with_meta) pairs, e.g. from iter_filter_segments()
+            episode_id: Optional episode identifier for output files
             
-            else:
-                # Fallback to average
-                return sum(confidences) / len(confidences)
-                
-        except Exception as e:
-            self.logger.warning(f"Confidence calculation failed: {e}")
-            return None
+        Yields:
+            The same (decision, segment_with_meta) pairs, unchanged
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        prefix = f"{episode_id}_{timestamp}" if episode_id else timestamp
+        base_path = os.path.join(self._output_dir, prefix)
+        
+        files = {}
+        counts = Counter()
+        dropped_samples = []
+        try:
+            for decision in DECISIONS:
+                files[decision] = open(f"{base_path}_segments_{decision}.json", 'wb', buffering=1 << 16)
+        except OSError as e:
+            self.logger.error(f"Failed to save filtering results: {e}", exc_info=True)
+            for f in files.values():
+                f.close()
+            files = None
+        
+        try:
+            for decision, segment in results:
+                if files is not None:
+                    try:
+                        files[decision].write((b'[\n  ' if not counts[decision] else b',\n  ') + self._json_item(segment))
+                    except (OSError, TypeError, ValueError) as e:
+                        self.logger.error(f"Failed to save filtering results: {e}", exc_info=True)
+                        for f in files.values():
+                            f.close()
+                        files = None
+                counts[decision] += 1
+                if decision == "dropped" and len(dropped_samples) < 5:
+                    dropped_samples.append(segment)
+                yield decision, segment
+        finally:
+            # Finalize the upstream iterator (and with it the stats) before reporting
+            close = getattr(results, 'close', None)
+            if close is not None:
+                close()
+            if files is not None:
+                try:
+                    for decision, f in files.items():
+                        f.write(b'\n]' if counts[decision] else b'[]')
+                        f.close()
+                    self._save_report(f"{base_path}_filter_report.txt", dropped_samples)
+                    self.logger.info(f"Confidence filtering results saved to {self._output_dir} with prefix {prefix}")
+                except OSError as e:
+                    self.logger.error(f"Failed to save filtering results: {e}", exc_info=True)
     
-    def _save_results(self, passed: List[Dict], flagged: List[Dict], 
-                     dropped: List[Dict], episode_id: Optional[str]):
-        """Save filtering results to files."""
+    @staticmethod
+    def _json_item(item: Dict[str, Any]) -> bytes:
+        """Encode one list item the way an indent-2 dump of the whole list would."""
+        if orjson is not None:
+            payload = orjson.dumps(item, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        else:
+            payload = json.dumps(item, indent=2, ensure_ascii=False).encode('utf-8')
+        # JSON strings escape newlines, so every raw newline is indentation
+        return payload.replace(b'\n', b'\n  ')
+    
+    def _save_report(self, report_path: str, dropped_samples: List[Dict]):
+        """Save human-readable filtering report."""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            prefix = f"{episode_id}_{timestamp}" if episode_id else timestamp
+            parts = []
+            parts.append(f"Confidence Filtering Report - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            parts.append("=" * 60 + "\n")
+            parts.append(f"Processing Duration: {self.stats['processing_duration']:.1f}s\n")
+            parts.append(f"Total Segments: {self.stats['total_segments']:,}\n\n")
             
-            output_dir = Path(self.config.output_dir)
+            parts.append("RESULTS:\n")
+            total = self.stats['total_segments']
+            if total > 0:
+                parts.append(f"- Passed: {self.stats['passed']} ({100*self.stats['passed']/total:.1f}%)\n")
+                parts.append(f"- Flagged: {self.stats['flagged']} ({100*self.stats['flagged']/total:.1f}%)\n")
+                parts.append(f"- Dropped: {self.stats['dropped']} ({100*self.stats['dropped']/total:.1f}%)\n\n")
             
-            # Save segment lists
-            with open(output_dir / f"{prefix}_segments_passed.json", 'w') as f:
-                json.dump(passed, f, indent=2, ensure_ascii=False)
+            # Confidence statistics
+            if self.stats['confidence_scores'].size:
+                scores = np.asarray(self.stats['confidence_scores'], dtype=np.float64)
+                # "weibull" is the (n + 1)p rule of statistics.quantiles' exclusive method, but
+                # clamps to the observed range: with fewer than 3 scores the old report
+                # extrapolated quartiles past the data (or raised for a single score)
+                q25, median, q75 = np.percentile(scores, [25, 50, 75], method="weibull")
+                parts.append("CONFIDENCE STATISTICS:\n")
+                parts.append(f"- Mean: {scores.mean():.3f}\n")
+                parts.append(f"- Median: {median:.3f}\n")
+                parts.append(f"- 25th percentile: {q25:.3f}\n")
+                parts.append(f"- 75th percentile: {q75:.3f}\n\n")
             
-            with open(output_dir / f"{prefix}_segments_flagged.json", 'w') as f:
-                json.dump(flagged, f, indent=2, ensure_ascii=False)
+            # Configuration used
+            parts.append("THRESHOLDS USED:\n")
+            parts.append(f"- High: {self.config.high_threshold}\n")
+            parts.append(f"- Low: {self.config.low_threshold}\n")
+            parts.append(f"- Min words: {self.config.min_words}\n")
+            parts.append(f"- Min words (high conf): {self.config.min_words_high_confidence}\n")
+            parts.append(f"- Short segment threshold: {self.config.short_segment_confidence_threshold}\n")
+            parts.append(f"- Max duration: {self.config.max_duration}s\n")
+            parts.append(f"- Method: {self.config.confidence_method}\n\n")
             
-            with open(output_dir / f"{prefix}_segments_dropped.json", 'w') as f:
-                json.dump(dropped, f, indent=2, ensure_ascii=False)
+            # Flagged reason breakdown
+            if self.stats['flagged_reasons']:
+                parts.append("FLAGGED REASONS:\n")
+                for reason, count in self.stats['flagged_reasons'].most_common():
+                    parts.append(f"- {reason}: {count}\n")
+                parts.append("\n")
             
-            # Save detailed report
-            self._save_report(output_dir / f"{prefix}_filter_report.txt", dropped)
+            # Dropped reason breakdown
+            if self.stats['dropped_reasons']:
+                parts.append("DROPPED REASONS:\n")
+                for reason, count in self.stats['dropped_reasons'].most_common():
+                    parts.append(f"- {reason}: {count}\n")
+                parts.append("\n")
             
-            self.logger.info(f"Confidence filtering results saved to {output_dir} with prefix {prefix}")
+            # Sample dropped segments
+            if dropped_samples:
+                parts.append("SAMPLE DROPPED SEGMENTS:\n")
+                for i, segment in enumerate(dropped_samples[:5]):  # Show first 5
+                    start_time = segment.get('start', 0)
+                    transcript = segment.get('transcript', '')[:50]
+                    confidence = segment.get('calculated_confidence') or 0.0
+                    mins, secs = divmod(int(start_time), 60)
+                    parts.append(f"- [{mins:02d}:{secs:02d}] \"{transcript}...\" (conf: {confidence:.2f})\n")
+                parts.append("\n")
             
-        except Exception as e:
-            self.logger.error(f"Failed to save filtering results: {e}", exc_info=True)
-    
-    def _save_report(self, report_path: Path, dropped_samples: List[Dict]):
-        """Save human-readable filtering report."""
-        try:
-            with open(report_path, 'w') as f:
-                f.write(f"Confidence Filtering Report - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("=" * 60 + "\n")
-                f.write(f"Processing Duration: {self.stats['processing_duration']:.1f}s\n")
-                f.write(f"Total Segments: {self.stats['total_segments']:,}\n\n")
-                
-                f.write("RESULTS:\n")
-                total = self.stats['total_segments']
-                if total > 0:
-                    f.write(f"- Passed: {self.stats['passed']} ({100*self.stats['passed']/total:.1f}%)\n")
-                    f.write(f"- Flagged: {self.stats['flagged']} ({100*self.stats['flagged']/total:.1f}%)\n")
-                    f.write(f"- Dropped: {self.stats['dropped']} ({100*self.stats['dropped']/total:.1f}%)\n\n")
-                
-                # Confidence statistics
-                if self.stats['confidence_scores']:
-                    scores = self.stats['confidence_scores']
-                    f.write("CONFIDENCE STATISTICS:\n")
-                    f.write(f"- Mean: {statistics.mean(scores):.3f}\n")
-                    f.write(f"- Median: {statistics.median(scores):.3f}\n")
-                    f.write(f"- 25th percentile: {statistics.quantiles(scores, n=4)[0]:.3f}\n")
-                    f.write(f"- 75th percentile: {statistics.quantiles(scores, n=4)[2]:.3f}\n\n")
-                
-                # Configuration used
-                f.write("THRESHOLDS USED:\n")
-                f.write(f"- High: {self.config.high_threshold}\n")
-                f.write(f"- Low: {self.config.low_threshold}\n")
-                f.write(f"- Min words: {self.config.min_words}\n")
-                f.write(f"- Min words (high conf): {self.config.min_words_high_confidence}\n")
-                f.write(f"- Short segment threshold: {self.config.short_segment_confidence_threshold}\n")
-                f.write(f"- Max duration: {self.config.max_duration}s\n")
-                f.write(f"- Method: {self.config.confidence_method}\n\n")
-                
-                # Flagged reason breakdown
-                if self.stats['flagged_reasons']:
-                    f.write("FLAGGED REASONS:\n")
-                    for reason, count in sorted(self.stats['flagged_reasons'].items(), 
-                                               key=lambda x: x[1], reverse=True):
-                        f.write(f"- {reason}: {count}\n")
-                    f.write("\n")
-                
-                # Dropped reason breakdown
-                if self.stats['dropped_reasons']:
-                    f.write("DROPPED REASONS:\n")
-                    for reason, count in sorted(self.stats['dropped_reasons'].items(), 
-                                               key=lambda x: x[1], reverse=True):
-                        f.write(f"- {reason}: {count}\n")
-                    f.write("\n")
-                
-                # Sample dropped segments
-                if dropped_samples:
-                    f.write("SAMPLE DROPPED SEGMENTS:\n")
-                    for i, segment in enumerate(dropped_samples[:5]):  # Show first 5
-                        start_time = segment.get('start', 0)
-                        transcript = segment.get('transcript', '')[:50]
-                        confidence = segment.get('calculated_confidence', 0)
-                        mins, secs = divmod(int(start_time), 60)
-                        f.write(f"- [{mins:02d}:{secs:02d}] \"{transcript}...\" (conf: {confidence:.2f})\n")
-                    f.write("\n")
-                
-                # Tuning hints
-                f.write("TUNING HINTS:\n")
-                drop_rate = self.stats['dropped'] / total if total > 0 else 0
-                if drop_rate > 0.15:
-                    f.write("- Consider lowering thresholds if >15% dropped\n")
-                f.write("- Review flagged segments for pattern analysis\n")
+            # Tuning hints
+            parts.append("TUNING HINTS:\n")
+            drop_rate = self.stats['dropped'] / total if total > 0 else 0
+            if drop_rate > 0.15:
+                parts.append("- Consider lowering thresholds if >15% dropped\n")
+            parts.append("- Review flagged segments for pattern analysis\n")
+            
+            with open(report_path, 'w', encoding='utf-8') as f:
+                f.write("".join(parts))
                 
         except Exception as e:
             self.logger.error(f"Failed to save report: {e}", exc_info=True)
\ No newline at end of file
@@ -17,15 +17,95 @@ Author: Benoit Meunier
 Created: 2025-06-29
 """
 
+import hashlib
 import logging
+import threading
+import time
+from datetime import datetime, timezone
 import numpy as np
-from typing import Optional, Dict, List, Any
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from itertools import chain, compress, islice
+from typing import Optional, Dict, List, Any, Iterable, Tuple
 from pathlib import Path
 
+try:
+    import httpx
+except ImportError:  # pragma: no cover - httpx ships with supabase but is optional here
+    httpx = None
+
 from .orchestrator import PodcastETLPipeline
 from ..speaker.supabase_embedding_index import SupabaseEmbeddingIndex
+from ..speaker.speaker_index import SpeakerReferenceIndex, quantize_int8
+from ..utils.models import TranscriptionChunk
 from ..constants import PROGRESS_LOG_INTERVAL, OPENAI_EMBEDDING_DIM
 
+# Rows per bulk upsert when flushing speaker embeddings to the index
+EMBEDDING_BATCH_SIZE = 500
+
+# Utterances shorter than this (seconds) carry no usable speech
+MIN_UTTERANCE_DURATION = 0.1
+
+# Utterances converted to/from segments at a time while confidence filtering
+CONFIDENCE_FILTER_WINDOW = 256
+
+# Seconds to reuse embedding index statistics before re-querying Supabase
+STATISTICS_CACHE_TTL = 60.0
+
+# Upper bound on episodes processed at once; Supabase and Deepgram stop
+# scaling well beyond a handful of concurrent uploads
+MAX_CONCURRENT_EPISODES_CAP = 8
+
+# Pooled HTTP connections shared by every Supabase caller (episode workers,
+# database_service, embedding index); sized to cover MAX_CONCURRENT_EPISODES_CAP
+SUPABASE_MAX_CONNECTIONS = 16
+SUPABASE_HTTP_RETRIES = 3
+
+# Storage formats for embeddings written to the Supabase index
+EMBEDDING_DTYPES = ('float32', 'int8')
+
+HOST_SPEAKER = "Alex Hormozi"
+
+# Model behind the stored speaker vectors (pipeline config 'speaker_embedding_model'
+# overrides it); part of the reference index cache key so a model switch rebuilds it
+SPEAKER_EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Speaker reference indexes already loaded by this process, keyed by cache path,
+# so later pipeline instances skip the disk load (and HNSW rebuild) entirely
+_REFERENCE_INDEXES: Dict[str, SpeakerReferenceIndex] = {}
+_REFERENCE_INDEXES_LOCK = threading.Lock()
+
+
+class SpeakerClass(IntEnum):
+    """Integration-stats category of an identified speaker label."""
+    HOST = 0
+    UNKNOWN = 1
+    GUEST = 2
+    RECOGNIZED = 3
+
+
+def classify_speaker(speaker: str) -> SpeakerClass:
+    """Map an identified speaker label to its SpeakerClass."""
+    if speaker == HOST_SPEAKER:
+        return SpeakerClass.HOST
+    if speaker.startswith('Unknown_'):
+        return SpeakerClass.UNKNOWN
+    if speaker.startswith('Guest_'):
+        return SpeakerClass.GUEST
+    # A named speaker carried over from previous episodes
+    return SpeakerClass.RECOGNIZED
+
+
+def episode_id_for_url(audio_url: str) -> str:
+    """
+    Derive a stable episode id from an audio URL.
+    
+    Unlike hash(), which is salted per process (PYTHONHASHSEED), the digest is the
+    same on every run, so cross-episode memory keyed on it survives restarts.
+    """
+    return f"episode_{hashlib.blake2b(audio_url.encode(), digest_size=4).hexdigest()}"
+
 
 class EnhancedPodcastETLPipeline(PodcastETLPipeline):
     """Enhanced ETL pipeline with embedding index integration."""
@@ -35,16 +115,34 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
                  skip_speaker_identification: bool = False,
                  embedding_index_path: str = "data/speaker_embeddings.db",
                  enable_cross_episode_memory: bool = True,
-                 full_mode: bool = False):
+                 full_mode: bool = False,
+                 max_concurrent_episodes: int = 1,
+                 embedding_dtype: str = 'float32'):
+        
+        if embedding_dtype not in EMBEDDING_DTYPES:
+            raise ValueError(f"embedding_dtype must be one of {EMBEDDING_DTYPES}, got {embedding_dtype!r}")
+        
+        # Per-episode state lives in thread-local storage so episodes can run concurrently
+        self._episode_state = threading.local()
         
         super().__init__(target_episode_title, max_episodes_per_run, skip_speaker_identification, full_mode)
         
+        # Only honoured by episode loops that dispatch through _process_episodes;
+        # the base run() still walks episodes one at a time
+        self.max_concurrent_episodes = max(1, min(max_concurrent_episodes, MAX_CONCURRENT_EPISODES_CAP))
+        
         # Embedding index configuration
         self.embedding_index_path = embedding_index_path
         self.enable_cross_episode_memory = enable_cross_episode_memory
+        self.embedding_dtype = embedding_dtype
         self.embedding_index = None
+        self.reference_index = None
         
-        # Integration statistics
+        # (fetched_at, statistics, summary) from the last get_statistics() call
+        self._statistics_cache = None
+        
+        # Integration statistics, shared across episode workers
+        self._stats_lock = threading.Lock()
         self.integration_stats = {
             'embeddings_added': 0,
             'speakers_recognized': 0,
@@ -54,12 +152,44 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
         
         # Track processed episodes for summary reporting
         self.processed_episodes = []
+        
+        # Timestamp shared by every episode's run_id, set when run() starts
+        self._run_id: Optional[str] = None
+        
+        # guid -> status preloaded in one query per run; None until preloaded
+        self._episode_status_cache: Optional[Dict[str, str]] = None
+        
+        # Embedding rows accumulated per episode, flushed in bulk to the index
+        self._pending_embeddings = []
+
+    @property
+    def current_episode_id(self) -> Optional[str]:
+        """Episode being processed by the calling thread, or None before one starts."""
+        return getattr(self._episode_state, 'episode_id', None)
+
+    @current_episode_id.setter
+    def current_episode_id(self, value: Optional[str]):
+        self._episode_state.episode_id = value
+
+    @property
+    def _pending_embeddings(self) -> List[Dict]:
+        """Embedding rows queued by the calling thread's episode."""
+        return self._episode_state.__dict__.setdefault('pending_embeddings', [])
+
+    @_pending_embeddings.setter
+    def _pending_embeddings(self, value: List[Dict]):
+        self._episode_state.pending_embeddings = value
 
     def initialize(self) -> bool:
         """Initialize all pipeline components including embedding index."""
         if not super().initialize():
             return False
         
+        try:
+            self._configure_connection_pool(self.client_manager.supabase)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Keeping default Supabase HTTP client: {e}")
+        
         # Initialize embedding index
         if self.enable_cross_episode_memory:
             try:
@@ -70,7 +200,7 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
                 self.embedding_index = SupabaseEmbeddingIndex(supabase_client)
                 
                 # Get current index statistics
-                stats = self.embedding_index.get_statistics()
+                stats = self._get_index_statistics(refresh=True)
                 self.logger.info(f"   📊 Index loaded: {stats['total_embeddings']} embeddings")
                 
                 known_speakers = [entry for entry in stats['by_speaker'] if entry['label']]
@@ -81,18 +211,15 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
                         count = entry['count']
                         self.logger.info(f"      - {speaker}: {count} embeddings")
                 
-                # Update speaker service with Supabase embedding index if available
+                # Point the existing speaker service at the Supabase embedding index;
+                # its models were already loaded by the base pipeline
                 if self.speaker_service:
-                    # Re-initialize speaker service with Supabase embedding index
-                    from ..speaker.service import SpeakerIdentificationService
-                    self.speaker_service = SpeakerIdentificationService(
-                        self.client_manager.hf_token
-                    )
-                    # Set the embedding index
                     self.speaker_service.embedding_index = self.embedding_index
-                    
-                    if not self.speaker_service.initialize_models():
-                        self.logger.warning("⚠️ Enhanced speaker service initialization failed, using fallback")
+                
+                # In-process HNSW index for speaker lookups instead of a linear cosine scan
+                self.reference_index = self._load_reference_index(stats)
+                if self.speaker_service:
+                    self.speaker_service.reference_index = self.reference_index
                 
                 self.logger.info("✅ Embedding index integration initialized successfully")
                 
@@ -103,6 +230,99 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
         
         return True
 
+    def _configure_connection_pool(self, supabase_client) -> None:
+        """
+        Swap the Supabase REST session for a pooled, retrying httpx client.
+        
+        database_service and the embedding index share this Supabase client, so
+        concurrent episode workers get up to SUPABASE_MAX_CONNECTIONS keep-alive
+        connections instead of serializing on one.
+        """
+        if httpx is None:
+            return
+        
+        postgrest = supabase_client.postgrest
+        session = postgrest.session
+        transport = httpx.HTTPTransport(
+            retries=SUPABASE_HTTP_RETRIES,
+            verify=getattr(postgrest, 'verify', True),
+            limits=httpx.Limits(max_connections=SUPABASE_MAX_CONNECTIONS,
+                                max_keepalive_connections=SUPABASE_MAX_CONNECTIONS)
+        )
+        postgrest.session = httpx.Client(
+            base_url=session.base_url,
+            headers=session.headers,
+            timeout=session.timeout,
+            follow_redirects=session.follow_redirects,
+            transport=transport
+        )
+        session.close()
+        self.logger.info(f"🔌 Supabase connection pool: {SUPABASE_MAX_CONNECTIONS} connections")
+
+    def _load_reference_index(self, stats: Dict) -> SpeakerReferenceIndex:
+        """
+        Load the speaker HNSW index from the process-wide or local disk cache.
+        
+        The cache is keyed on the embedding model and dimension plus the Supabase
+        row count and latest updated_at ('last_updated' in get_statistics()), so
+        re-embedded or upserted rows invalidate it as well as added or removed
+        ones. On a miss the index is rebuilt from every row; flushes re-save the
+        snapshot under a fresh key so the next run can load it.
+        """
+        index_path = Path(self.embedding_index_path).with_suffix('.hnsw')
+        with _REFERENCE_INDEXES_LOCK:
+            reference_index = self._refresh_reference_index(index_path, stats)
+            _REFERENCE_INDEXES[str(index_path)] = reference_index
+        return reference_index
+
+    def _reference_cache_key(self, stats: Dict) -> str:
+        model = self.pipeline_config.get('speaker_embedding_model', SPEAKER_EMBEDDING_MODEL)
+        version = f"{model}:{OPENAI_EMBEDDING_DIM}:{stats.get('total_embeddings', 0)}:{stats.get('last_updated')}"
+        return hashlib.sha256(version.encode()).hexdigest()
+
+    def _refresh_reference_index(self, index_path: Path, stats: Dict) -> SpeakerReferenceIndex:
+        last_updated = stats.get('last_updated')
+        cache_key = self._reference_cache_key(stats)
+        
+        # Without an updated_at watermark a rewritten row can't be detected, so no snapshot is trusted
+        reference_index = None
+        if last_updated is None:
+            self.logger.info("   ℹ️ Embedding index reports no last_updated; rebuilding speaker index")
+        else:
+            # Process-wide instance first, then the on-disk snapshot
+            reference_index = _REFERENCE_INDEXES.get(str(index_path))
+        if reference_index is not None and reference_index.cache_key == cache_key:
+            self.logger.info(f"   ⚡ Reusing in-process speaker index ({len(reference_index)} vectors)")
+            return reference_index
+        
+        if reference_index is None and last_updated is not None and index_path.exists():
+            try:
+                reference_index = SpeakerReferenceIndex.load(str(index_path))
+            except Exception as e:
+                self.logger.warning(f"   ⚠️ Ignoring unreadable speaker index cache {index_path}: {e}")
+        
+        if reference_index is not None and reference_index.cache_key == cache_key:
+            self.logger.info(f"   ⚡ Loaded speaker HNSW index from {index_path} ({len(reference_index)} vectors)")
+            return reference_index
+        
+        # Rows were added, removed or rewritten since the snapshot (or there is none):
+        # cached vectors may be stale, so rebuild from every row
+        reference_index = SpeakerReferenceIndex(dim=OPENAI_EMBEDDING_DIM)
+        rows = self.embedding_index.get_all_embeddings()
+        if rows:
+            # int8 rows carry a per-vector scale; float32 rows scale by 1
+            embeddings = np.asarray([row['embedding'] for row in rows], dtype=np.float32)
+            embeddings *= np.asarray([row.get('embedding_scale', 1.0) for row in rows], dtype=np.float32)[:, None]
+            reference_index.add_items(
+                embeddings,
+                [row.get('label') or row.get('speaker_label') or 'unknown' for row in rows]
+            )
+        
+        reference_index.cache_key = cache_key
+        reference_index.save(str(index_path))
+        self.logger.info(f"   🏗️ Rebuilt speaker HNSW index cache: {len(reference_index)} vectors")
+        return reference_index
+
     def _create_chunks_from_transcription(self, transcription_data, audio_url):
         """Enhanced chunk creation with embedding index integration."""
         chunks = []
@@ -157,11 +377,11 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
             self.logger.info("   🔍 Applying confidence filtering...")
             try:
                 from ..utils.confidence_adapter import ConfidenceAdapter
-                from ..utils.confidence_filter import ConfidenceFilter, ConfidenceFilterConfig
+                from ..utils.confidence_filter import (
+                    ConfidenceFilter, ConfidenceFilterConfig, DECISIONS, DECISION_CODES
+                )
                 
-                # Convert utterances to segments format
                 adapter = ConfidenceAdapter()
-                segments = adapter.utterances_to_segments(utterances)
                 
                 # Configure and apply filtering
                 cf_config = self.pipeline_config.get('confidence_filtering', {})
@@ -177,20 +397,48 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
                 )
                 
                 confidence_filter = ConfidenceFilter(confidence_config)
-                passed_segments, flagged_segments, dropped_segments = confidence_filter.filter_segments(
-                    segments, 
-                    episode_id=hasattr(self, 'current_episode_id') and self.current_episode_id or 'unknown',
-                    save_results=True
-                )
+                episode_id = self.current_episode_id or 'unknown'
+                save_results = cf_config.get('save_results', True)
                 
-                # Convert back to utterances format (only passed segments)
-                filtered_utterances = adapter.segments_to_utterances(passed_segments)
+                # Stream utterances through the filter window by window instead of
+                # materializing a full segments copy of the episode up front
+                remaining = iter(utterances)
+                windows = iter(lambda: list(islice(remaining, CONFIDENCE_FILTER_WINDOW)), [])
+                counts = Counter()
+                filtered_utterances = []
+                
+                if save_results:
+                    # Result files need the metadata-augmented segment copies; they are
+                    # written as they stream past rather than collected per decision
+                    segments = chain.from_iterable(adapter.utterances_to_segments(window) for window in windows)
+                    results = confidence_filter.save_results(
+                        confidence_filter.iter_filter_segments(segments), episode_id
+                    )
+                    passed_window = []
+                    for decision, segment in results:
+                        counts[decision] += 1
+                        if decision == "passed":
+                            # Convert back to utterances format (only passed segments)
+                            passed_window.append(segment)
+                            if len(passed_window) == CONFIDENCE_FILTER_WINDOW:
+                                filtered_utterances.extend(adapter.segments_to_utterances(passed_window))
+                                passed_window = []
+                    if passed_window:
+                        filtered_utterances.extend(adapter.segments_to_utterances(passed_window))
+                else:
+                    # Nothing is written out: keep the original utterance dicts, selected by
+                    # the compact decision codes, instead of round-tripping through segments.
+                    # One call over the whole stream so the filter's stats cover the episode
+                    segments = chain.from_iterable(adapter.utterances_to_segments(window) for window in windows)
+                    result = confidence_filter.filter_segments(segments, return_metadata=False)
+                    filtered_utterances = list(compress(utterances, (result.decisions == DECISION_CODES["passed"]).tolist()))
+                    counts.update(dict(zip(DECISIONS, np.bincount(result.decisions, minlength=len(DECISIONS)).tolist())))
                 
                 # Log filtering results
                 total_original = len(utterances)
                 total_passed = len(filtered_utterances)
-                total_flagged = len(flagged_segments)
-                total_dropped = len(dropped_segments)
+                total_flagged = counts["flagged"]
+                total_dropped = counts["dropped"]
                 
                 self.logger.info(f"      Confidence filtering results:")
                 self.logger.info(f"      - Original: {total_original} utterances")
@@ -213,8 +461,9 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
         if self.speaker_service and not self.pipeline_config.get('skip_speaker_identification', False):
             self.logger.info("   🎤 Running enhanced speaker identification with cross-episode memory...")
             
-            # Use enhanced speaker service with embedding index
-            episode_id = hasattr(self, 'current_episode_id') and self.current_episode_id or 'unknown'
+            # Use enhanced speaker service with embedding index; always pass an id so
+            # the service never falls back to a per-process hash of the URL
+            episode_id = self.current_episode_id or episode_id_for_url(audio_url)
             identified_utterances = self.speaker_service.identify_speakers_in_utterances(
                 audio_url, utterances, episode_id
             )
@@ -222,25 +471,33 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
             # Analyze speaker identification results
             speaker_stats = self.speaker_service.get_speaker_statistics(identified_utterances)
             
-            # Count recognition vs new unknowns
             for speaker, count in speaker_stats.items():
                 self.logger.info(f"      {speaker}: {count} utterances")
-                
-                if speaker == "Alex Hormozi":
-                    self.integration_stats['speakers_recognized'] += count
-                elif speaker.startswith('Unknown_'):
-                    self.integration_stats['new_unknowns'] += count
-                elif not speaker.startswith('Guest_'):
-                    # This is a recognized speaker from previous episodes
-                    self.integration_stats['speakers_recognized'] += count
-                    self.integration_stats['cross_episode_matches'] += count
+            
+            # Count recognition vs new unknowns per SpeakerClass in one bincount, from the
+            # codes the speaker service attached to each utterance when present
+            try:
+                codes = np.fromiter((utterance['speaker_class'] for utterance in identified_utterances),
+                                    dtype=np.int8, count=len(identified_utterances))
+                counts = np.bincount(codes, minlength=len(SpeakerClass))
+            except (KeyError, TypeError, ValueError):
+                # Otherwise classify each distinct label once, weighted by its utterance count
+                codes = np.fromiter((classify_speaker(speaker) for speaker in speaker_stats),
+                                    dtype=np.int8, count=len(speaker_stats))
+                weights = np.fromiter(speaker_stats.values(), dtype=np.int64, count=len(speaker_stats))
+                counts = np.bincount(codes, weights=weights, minlength=len(SpeakerClass)).astype(np.int64)
+            
+            with self._stats_lock:
+                self.integration_stats['speakers_recognized'] += int(counts[SpeakerClass.HOST] + counts[SpeakerClass.RECOGNIZED])
+                self.integration_stats['new_unknowns'] += int(counts[SpeakerClass.UNKNOWN])
+                self.integration_stats['cross_episode_matches'] += int(counts[SpeakerClass.RECOGNIZED])
         else:
             self.logger.info("   🔇 Using fallback speaker assignment")
             # Apply fallback assignment
             for utterance in identified_utterances:
                 deepgram_speaker = utterance.get('speaker', 0)
                 if deepgram_speaker == 0:
-                    utterance['identified_speaker'] = "Alex Hormozi"
+                    utterance['identified_speaker'] = HOST_SPEAKER
                 else:
                     utterance['identified_speaker'] = f"Guest_{deepgram_speaker}"
         
@@ -248,14 +505,28 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
 
     def _create_chunks_with_embeddings(self, utterances):
         """Create chunks with enhanced metadata."""
-        from ..utils.models import TranscriptionChunk
-        chunks = []
+        episode_id = self.current_episode_id or 'unknown'
+        self._pending_embeddings = []
         
+        # Drop empty and sub-MIN_UTTERANCE_DURATION utterances up front so the chunk
+        # list can be sized exactly; cheap checks run before any string is built
+        accepted = []
         for i, utterance in enumerate(utterances):
-            text = utterance.get('transcript', '').strip()
+            transcript = utterance.get('transcript')
+            if not transcript:
+                continue
+            start, end = utterance.get('start'), utterance.get('end')
+            if start is not None and end is not None and end - start < MIN_UTTERANCE_DURATION:
+                continue
+            text = transcript.strip()
             if not text:
                 continue
-            
+            accepted.append((i, utterance, text))
+        
+        chunks = [None] * len(accepted)
+        next_progress_log = PROGRESS_LOG_INTERVAL
+        
+        for n, (i, utterance, text) in enumerate(accepted, 1):
             # Extract timing and speaker info
             start_time = utterance.get('start', 0.0)
             end_time = utterance.get('end', 0.0)
@@ -274,21 +545,66 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
                 sentiment_score=0.0   # Default for now
             )
             
-            chunks.append(chunk)
+            chunks[n - 1] = chunk
             
-            if (i + 1) % PROGRESS_LOG_INTERVAL == 0:
-                self.logger.info(f"Processed {i + 1}/{len(utterances)} utterances...")
+            # Queue speaker embedding for a single bulk write in _update_embedding_index
+            speaker_embedding = utterance.get('embedding')
+            if speaker_embedding is not None and self.embedding_index:
+                self._pending_embeddings.append({
+                    'episode_id': episode_id,
+                    'utterance_idx': i,
+                    'speaker_label': identified_speaker,
+                    'embedding': speaker_embedding
+                })
+            
+            if n == next_progress_log:
+                self.logger.info(f"Processed {n}/{len(accepted)} utterances...")
+                next_progress_log += PROGRESS_LOG_INTERVAL
         
         return chunks
 
-    def _update_embedding_index(self, utterances):
-        """Update embedding index with episode data (this is handled by speaker service now)."""
-        # The embedding index is updated automatically by the enhanced speaker service
-        # during identify_speakers_in_utterances, so we just track statistics here
+    def _update_embedding_index(self, utterances, batch_size: int = EMBEDDING_BATCH_SIZE):
+        """Flush queued utterance embeddings to the index in bulk upserts."""
+        pending, self._pending_embeddings = self._pending_embeddings, []
         
         if not self.embedding_index:
             return
         
+        # One multi-row upsert per batch instead of a round-trip per utterance;
+        # (episode_id, utterance_idx) keeps reprocessing idempotent
+        if pending and hasattr(self.embedding_index, 'add_many'):
+            embeddings = np.asarray([row['embedding'] for row in pending], dtype=np.float32)
+            rows = pending
+            if self.embedding_dtype == 'int8':
+                # A quarter of the egress and storage of float32 vectors
+                codes, scales = quantize_int8(embeddings)
+                rows = [dict(row, embedding=code, embedding_scale=scale)
+                        for row, code, scale in zip(pending, codes.tolist(), scales.tolist())]
+            
+            # Flushes are serialized so the snapshot key never counts rows another
+            # worker has written to Supabase but not yet added to the HNSW index
+            with _REFERENCE_INDEXES_LOCK:
+                for start in range(0, len(rows), batch_size):
+                    self.embedding_index.add_many(
+                        rows[start:start + batch_size],
+                        on_conflict='episode_id,utterance_idx'
+                    )
+                with self._stats_lock:
+                    self.integration_stats['embeddings_added'] += len(pending)
+                self._statistics_cache = None  # Writes invalidate cached statistics
+                
+                # Keep the in-process HNSW index in step with the new vectors
+                if self.reference_index is not None:
+                    self.reference_index.add_items(
+                        embeddings,
+                        [row['speaker_label'] for row in pending]
+                    )
+                    self._save_reference_index()
+            return
+        
+        # Otherwise the speaker service updates the index during
+        # identify_speakers_in_utterances, so we just track statistics here
+        
         # Count embeddings that would be added
         unique_speakers = set()
         for utterance in utterances:
@@ -297,13 +613,23 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
                 unique_speakers.add(speaker)
         
         # This is an approximation since actual embedding addition happens in speaker service
-        self.integration_stats['embeddings_added'] = len(unique_speakers)
+        with self._stats_lock:
+            self.integration_stats['embeddings_added'] = len(unique_speakers)
+
+    def _save_reference_index(self) -> None:
+        """Re-key and persist the speaker index after a flush so the next run loads it instead of rebuilding."""
+        try:
+            stats = self._get_index_statistics(refresh=True)
+            if stats.get('last_updated') is None:
+                return  # An unkeyed snapshot would be rebuilt on load anyway
+            self.reference_index.cache_key = self._reference_cache_key(stats)
+            self.reference_index.save(str(Path(self.embedding_index_path).with_suffix('.hnsw')))
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not save speaker index snapshot: {e}")
 
     def _process_single_episode(self, episode):
         """Enhanced episode processing with accurate reporting."""
         
-        import time
-        from datetime import datetime, timezone
         episode_start_time = time.time()
         stages_completed = []
         stage_metrics = {}
@@ -314,7 +640,7 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
             
             # Check if episode needs processing (double-check)
             normalized_guid = episode.guid
-            exists, current_status = self.database_service.episode_exists(normalized_guid)
+            exists, current_status = self._episode_status(normalized_guid)
             
             if exists and current_status == 'processed':
                 self.logger.info(f"✅ Episode already fully processed: {episode.title}")
@@ -325,6 +651,7 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
             if not self.database_service.insert_episode_record(episode, {}, "processing"):
                 self.logger.error(f"❌ Failed to create episode record: {episode.title}")
                 return False
+            self._cache_episode_status(normalized_guid, "processing")
             
             actual_processing_occurred = True  # ✅ Now we're actually processing
             
@@ -334,15 +661,18 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
             if success:
                 # Update final status
                 self.database_service._update_episode_status(normalized_guid, "processed", episode.title)
+                self._cache_episode_status(normalized_guid, "processed")
                 self.logger.info(f"✅ Episode processing complete: {episode.title}")
                 # Track successfully processed episode
-                self.processed_episodes.append({
-                    'guid': normalized_guid,
-                    'title': episode.title
-                })
+                with self._stats_lock:
+                    self.processed_episodes.append({
+                        'guid': normalized_guid,
+                        'title': episode.title
+                    })
             else:
                 # Mark as failed
                 self.database_service._update_episode_status(normalized_guid, "failed", episode.title)
+                self._cache_episode_status(normalized_guid, "failed")
                 self.logger.error(f"❌ Episode processing failed: {episode.title}")
             
             return success
@@ -352,6 +682,7 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
             if actual_processing_occurred:
                 # Mark as failed only if we actually started processing
                 self.database_service._update_episode_status(episode.guid, "failed", episode.title)
+                self._cache_episode_status(episode.guid, "failed")
             return False
             
         finally:
@@ -361,12 +692,52 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
                 self._capture_episode_insights(episode, success, episode_start_time, stages_completed, stage_metrics)
             # ✅ No fake insights for no-ops
     
+    def _process_episodes(self, episodes: Iterable) -> List[bool]:
+        """
+        Process episodes, overlapping their network waits when concurrency is enabled.
+        
+        Episodes are I/O-bound (Deepgram, embedding API, Supabase writes), so up to
+        max_concurrent_episodes run on worker threads. Results keep input order.
+        """
+        episodes = list(episodes)
+        self._preload_episode_statuses(episodes)
+        if self.max_concurrent_episodes == 1 or len(episodes) < 2:
+            return [self._process_single_episode(episode) for episode in episodes]
+        
+        workers = min(self.max_concurrent_episodes, len(episodes))
+        self.logger.info(f"⚡ Processing {len(episodes)} episodes with {workers} workers")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='episode') as executor:
+            return list(executor.map(self._process_single_episode, episodes))
+    
+    def _preload_episode_statuses(self, episodes: List) -> None:
+        """Fetch the status of every queued episode in one query instead of one per episode."""
+        if not episodes or not hasattr(self.database_service, 'bulk_episode_status'):
+            return
+        try:
+            statuses = self.database_service.bulk_episode_status([episode.guid for episode in episodes])
+        except Exception as e:
+            self.logger.warning(f"⚠️ Episode status preload failed, checking episodes individually: {e}")
+            return
+        
+        if self._episode_status_cache is None:
+            self._episode_status_cache = {}
+        self._episode_status_cache.update(statuses)
+    
+    def _episode_status(self, guid: str) -> Tuple[bool, Optional[str]]:
+        """Return (exists, status) for an episode, from the preloaded statuses when available."""
+        if self._episode_status_cache is None:
+            return self.database_service.episode_exists(guid)
+        status = self._episode_status_cache.get(guid)
+        return status is not None, status
+    
+    def _cache_episode_status(self, guid: str, status: str) -> None:
+        """Keep preloaded statuses in step with status writes."""
+        if self._episode_status_cache is not None:
+            self._episode_status_cache[guid] = status
+    
     def _capture_no_op_insights(self, episode, start_time: float, reason: str):
         """Capture insights for episodes that didn't need processing."""
         
-        import time
-        from datetime import datetime, timezone
-        
         total_time = time.time() - start_time
         
         # Create accurate no-op insight report
@@ -426,17 +797,17 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
         This method enhances the basic stage metrics with more detailed insights
         without modifying the core pipeline execution.
         """
-        from datetime import datetime
-        
         # Create enhanced copy of stage metrics
         enhanced_metrics = stage_metrics.copy()
         
-        # Calculate total duration
-        total_duration = (datetime.now() - start_time).total_seconds()
+        # Calculate total duration (start_time is a time.time() float)
+        total_duration = time.time() - start_time
+        if self._run_id is None:
+            self._run_id = datetime.now().strftime('%Y%m%d-%H%M%S')
         
         # Generate comprehensive pipeline summary
         pipeline_summary = {
-            "run_id": f"run-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{episode.guid[:8]}",
+            "run_id": f"run-{self._run_id}-{episode.guid[:8]}",
             "total_duration": total_duration,
             "total_stages": len(stage_metrics),
             "successful_stages": len([s for s in stage_metrics.values() if s.get("success", False)]),
@@ -515,12 +886,13 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
 
     def _calculate_average_confidence(self, stage_metrics):
         """Calculate average confidence across all stages."""
-        confidences = []
-        for stage_data in stage_metrics.values():
-            if isinstance(stage_data, dict) and "confidence" in stage_data:
-                confidences.append(stage_data["confidence"])
+        confidences = np.fromiter(
+            (stage_data["confidence"] for stage_data in stage_metrics.values()
+             if isinstance(stage_data, dict) and "confidence" in stage_data),
+            dtype=np.float64
+        )
         
-        return sum(confidences) / len(confidences) if confidences else 0.75
+        return float(confidences.mean()) if confidences.size else 0.75
 
     def _get_embedding_index_stats(self):
         """Get embedding index statistics for insights."""
@@ -528,16 +900,37 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
             return {}
         
         try:
-            stats = self.embedding_index.get_statistics()
-            return {
-                "total_embeddings": stats.get("total_embeddings", 0),
-                "known_speakers": len([s for s in stats.get("by_speaker", []) if s.get("label")]),
-                "unknown_speakers": len([s for s in stats.get("by_speaker", []) if not s.get("label")])
-            }
+            return self._index_statistics_entry()[2].copy()
         except Exception as e:
             self.logger.warning(f"Failed to get embedding index stats: {e}")
             return {}
 
+    def _get_index_statistics(self, refresh: bool = False) -> Dict:
+        """
+        Get embedding index statistics, reusing them for STATISTICS_CACHE_TTL seconds.
+        
+        The cache is dropped whenever this pipeline writes to the index, and the
+        derived speaker summary is computed once per fetch rather than per episode.
+        """
+        return self._index_statistics_entry(refresh)[1]
+
+    def _index_statistics_entry(self, refresh: bool = False) -> Tuple[float, Dict, Dict]:
+        """Return the (fetched_at, statistics, summary) cache entry, refetching it when stale."""
+        # Read the shared cache once: another worker may reset it to None at any time
+        now = time.monotonic()
+        cache = self._statistics_cache
+        if refresh or cache is None or now - cache[0] > STATISTICS_CACHE_TTL:
+            stats = self.embedding_index.get_statistics()
+            by_speaker = stats.get("by_speaker", [])
+            known = sum(1 for s in by_speaker if s.get("label"))
+            summary = {
+                "total_embeddings": stats.get("total_embeddings", 0),
+                "known_speakers": known,
+                "unknown_speakers": len(by_speaker) - known
+            }
+            cache = self._statistics_cache = (now, stats, summary)
+        return cache
+
     def run(self) -> None:
         """Run the enhanced pipeline with embedding index integration."""
         self.logger.info("=" * 60)
@@ -555,6 +948,8 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
         
         # Reset processed episodes list for this run
         self.processed_episodes = []
+        self._run_id = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self._episode_status_cache = None
         
         # Run the standard pipeline
         super().run()
@@ -569,24 +964,18 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
             self.logger.info("📊 Generating post-processing analytics reports...")
             
             # Get updated index statistics
-            stats = self.embedding_index.get_statistics()
+            stats = self._get_index_statistics(refresh=True)
             self.logger.info(f"📈 Updated index stats: {stats['total_embeddings']} total embeddings")
             
-            # Generate performance report
+            # Generate performance report in-process against the already-loaded index,
+            # rather than paying interpreter startup and a Supabase reconnect in a subprocess
             self.logger.info("   📋 Generating performance report...")
-            from pathlib import Path
-            import subprocess
-            
-            script_path = Path(__file__).parent.parent.parent.parent / "scripts" / "analyze_embedding_performance.py"
-            if script_path.exists():
-                result = subprocess.run([
-                    "python", str(script_path)
-                ], capture_output=True, text=True)
-                
-                if result.returncode == 0:
-                    self.logger.info("   ✅ Performance report generated successfully")
-                else:
-                    self.logger.warning(f"   ⚠️ Performance report generation failed: {result.stderr}")
+            try:
+                from ..analytics.embedding_performance import run_report
+                run_report(self.embedding_index)
+                self.logger.info("   ✅ Performance report generated successfully")
+            except Exception as e:
+                self.logger.warning(f"   ⚠️ Performance report generation failed: {e}")
             
             # Run clustering to find new patterns
             self.logger.info("   🧩 Running speaker clustering...")
@@ -606,15 +995,17 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
 
     def get_integration_stats(self) -> Dict:
         """Get embedding index integration statistics."""
-        return self.integration_stats.copy()
+        with self._stats_lock:
+            return self.integration_stats.copy()
     
     def get_processed_episodes(self) -> List[Dict]:
         """Get list of episodes processed in this pipeline run."""
-        return self.processed_episodes.copy()
+        with self._stats_lock:
+            return self.processed_episodes.copy()
 
     def manual_speaker_attribution_mode(self):
         """Enter manual speaker attribution mode for the last processed episode."""
-        if not self.enable_cross_episode_memory or not hasattr(self, 'current_episode_id'):
+        if not self.enable_cross_episode_memory or not self.current_episode_id:
             self.logger.error("❌ Manual attribution requires cross-episode memory and a processed episode")
             return
         
@@ -625,7 +1016,8 @@ class EnhancedPodcastETLPipeline(PodcastETLPipeline):
 # Convenience function for production use
 def run_enhanced_pipeline(target_episode: Optional[str] = None, 
                          max_episodes: int = 1,
-                         embedding_index_path: str = "data/speaker_embeddings.db") -> bool:
+                         embedding_index_path: str = "data/speaker_embeddings.db",
+                         embedding_dtype: str = 'float32') -> bool:
     """
     Convenience function to run the enhanced pipeline.
     
@@ -633,6 +1025,7 @@ def run_enhanced_pipeline(target_episode: Optional[str] = None,
         target_episode: Specific episode to process (optional)
         max_episodes: Maximum episodes to process
         embedding_index_path: Path to embedding index database
+        embedding_dtype: Storage format for new embeddings ('float32' or 'int8')
         
     Returns:
         True if successful, False otherwise
@@ -642,7 +1035,8 @@ def run_enhanced_pipeline(target_episode: Optional[str] = None,
             target_episode_title=target_episode,
             max_episodes_per_run=max_episodes,
             embedding_index_path=embedding_index_path,
-            enable_cross_episode_memory=True
+            enable_cross_episode_memory=True,
+            embedding_dtype=embedding_dtype
         )
         
         pipeline.run()
@@ -7,25 +7,25 @@ Ensures all GUIDs are consistently formatted as 36-character UUIDs.
 
 import re
 import uuid
-from typing import Optional
+from functools import lru_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Characters stripped when recovering a UUID from a mixed-format GUID
+NON_HEX_PATTERN = re.compile(r'[^0-9a-f]')
+
 class GUIDNormalizer:
     """Centralized GUID normalization and validation."""
     
-    # Standard UUID regex (36 chars with hyphens)
-    UUID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
-    
-    # Compact UUID regex (32 chars without hyphens)  
-    COMPACT_UUID_PATTERN = re.compile(r'^[0-9a-f]{32}$', re.IGNORECASE)
-    
     @staticmethod
+    @lru_cache(maxsize=4096)
     def normalize(guid: str) -> str:
         """
         Convert any valid GUID format to standard 36-character UUID.
         
+        Results are cached, since feeds re-present the same GUIDs on every poll.
+        
         Args:
             guid: Input GUID in any valid format
             
@@ -40,37 +40,45 @@ class GUIDNormalizer:
         
         guid = str(guid).strip().lower()
         
-        # Already normalized
-        if GUIDNormalizer.UUID_PATTERN.match(guid):
-            return guid
-        
-        # Compact format - add hyphens
-        if GUIDNormalizer.COMPACT_UUID_PATTERN.match(guid):
-            return f"{guid[:8]}-{guid[8:12]}-{guid[12:16]}-{guid[16:20]}-{guid[20:]}"
+        # Hyphenated, compact, braced and urn:uuid: forms
+        try:
+            return str(uuid.UUID(guid))
+        except ValueError:
+            pass
         
         # Try to extract valid UUID from mixed format
-        clean = re.sub(r'[^0-9a-f]', '', guid, flags=re.IGNORECASE)
-        if len(clean) == 32 and GUIDNormalizer.COMPACT_UUID_PATTERN.match(clean):
-            return f"{clean[:8]}-{clean[8:12]}-{clean[12:16]}-{clean[16:20]}-{clean[20:]}"
+        clean = NON_HEX_PATTERN.sub('', guid)
+        if len(clean) == 32:
+            return str(uuid.UUID(clean))
         
         raise ValueError(f"Invalid GUID format: {guid}")
     
     @staticmethod
+    @lru_cache(maxsize=4096)
     def validate(guid: str) -> bool:
         """
         Validate if a string is a valid GUID in any supported format.
         
+        Cached like normalize(), so re-validating a known GUID is a single lookup.
+        
         Args:
             guid: Input string to validate
             
         Returns:
             True if valid GUID format, False otherwise
         """
+        if not guid:
+            return False
+        
+        guid = str(guid).strip().lower()
+        
+        # Same acceptance rules as normalize(), without building the result
+        # or raising for the common mixed-format and invalid cases
         try:
-            GUIDNormalizer.normalize(guid)
+            uuid.UUID(guid)
             return True
-        except (ValueError, TypeError):
-            return False
+        except ValueError:
+            return len(NON_HEX_PATTERN.sub('', guid)) == 32
     
     @staticmethod
     def generate() -> str:
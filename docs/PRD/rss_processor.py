@@ -18,29 +18,152 @@ Created: 2025-06-26
 Last Updated: 2025-06-26
 """
 
+import html
 import logging
 import feedparser
 import re
-from typing import List, Optional
+import xml.etree.ElementTree as ET
+from typing import Iterator, List, Optional
+from urllib.error import URLError
+from urllib.parse import urlparse
+from urllib.request import Request, urlopen
+
+from dateutil import parser as _dtparser
+from dateutil.tz import tzoffset
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml is optional
+    lxml = None
+    etree = None
 
 from ..utils.models import EpisodeMetadata
 from ..utils.config import config
 from ..utils.guid_normalizer import GUIDNormalizer
 
+logger = logging.getLogger(__name__)
+
+# Seconds to wait on the feed server before giving up
+FEED_TIMEOUT = 30
+
+ATOM_NAMESPACE = "http://www.w3.org/2005/Atom"
+ITUNES_NAMESPACE = "http://www.itunes.com/dtds/podcast-1.0.dtd"
+
+# Read entries straight off lxml instead of round-tripping each one through
+# feedparser; pipeline config 'use_lxml_parser' overrides it during rollout
+USE_LXML_PARSER = True
+
+_FEED_PARSE_ERRORS = (ET.ParseError,) + ((etree.XMLSyntaxError,) if etree is not None else ())
+
+# Show notes can run to 10+ KB of HTML per episode; only this much plain text is kept
+MAX_DESCRIPTION_LEN = 4096
+
+_TAG_PATTERN = re.compile(r'<[^>]*>')
+
+# Timezone abbreviations seen in podcast pubDates. Each abbreviation names a fixed
+# offset (PDT is always UTC-7), so they map to tzoffsets built once at import
+_TZINFOS = {name: tzoffset(name, hours * 3600) for name, hours in {
+    'UT': 0,
+    'EST': -5, 'EDT': -4,
+    'CST': -6, 'CDT': -5,
+    'MST': -7, 'MDT': -6,
+    'PST': -8, 'PDT': -7,
+    'AKST': -9, 'AKDT': -8,
+    'HST': -10,
+}.items()}
+
+
+def _resolve_tz(name: Optional[str], offset: Optional[int]):
+    """dateutil tzinfos hook: explicit offsets win, abbreviations must be known."""
+    if offset is not None:
+        return tzoffset(name, offset)
+    try:
+        return _TZINFOS[name]
+    except KeyError:
+        raise ValueError(f"Unknown timezone abbreviation: {name}") from None
+
+
+def parse_publish_date(published: str) -> str:
+    """
+    Parse an RSS/Atom publish date once into an ISO 8601 string.
+    
+    A date dateutil can't parse, or one with an unknown timezone abbreviation, is
+    logged and returned as-is so the episode is still kept.
+    """
+    if not published:
+        return ''
+    try:
+        return _dtparser.parse(published, tzinfos=_resolve_tz).isoformat()
+    except (ValueError, OverflowError) as e:
+        logger.warning(f"Keeping unparsed publish date '{published}': {e}")
+        return published
+
+
+def _strip_tags(markup: str) -> str:
+    if lxml is not None:
+        try:
+            # Join text nodes with spaces, like the fallback, so adjacent blocks don't run together
+            return ' '.join(lxml.html.fragment_fromstring(markup, create_parent='div').itertext())
+        except (etree.ParserError, etree.XMLSyntaxError, ValueError):
+            pass  # lxml rejects some malformed fragments; fall back to a tag strip
+    return html.unescape(_TAG_PATTERN.sub(' ', markup))
+
+
+def description_text(description: str, max_len: int = MAX_DESCRIPTION_LEN) -> str:
+    """
+    Reduce an RSS description to whitespace-collapsed plain text of at most max_len chars.
+    
+    Markup is stripped once at ingest, with lxml's C parser when installed, so the
+    pipeline carries neither the HTML bytes nor the full show notes per episode.
+    """
+    if not description:
+        return ''
+    if '<' in description:
+        description = _strip_tags(description)
+    elif '&' in description:
+        description = html.unescape(description)
+    return ' '.join(description.split())[:max_len]
+
+
 
 class RSSProcessor:
     """Processes RSS feeds to extract episode metadata."""
     
+    _EP_NUM_RE = re.compile(r'Ep\s*(\d+)', re.IGNORECASE)
+    _AUDIO_EXT_RE = re.compile(r'\.(mp3|wav|m4a|mp4|aac)(\?|#|$)', re.IGNORECASE)
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.pipeline_config = config.load_pipeline_config()
+        
+        self.use_lxml_parser = etree is not None and self.pipeline_config.get('use_lxml_parser', USE_LXML_PARSER)
+        
+        # One alternation pattern searched per title instead of a substring scan per keyword
+        rerun_keywords = self.pipeline_config['rerun_keywords']
+        self._rerun_re = re.compile(
+            '|'.join(re.escape(keyword) for keyword in rerun_keywords), re.IGNORECASE
+        ) if rerun_keywords else None
     
     def fetch_episodes(self, feed_url: str) -> List[EpisodeMetadata]:
         """Fetch episodes with normalized GUIDs and validation."""
         self.logger.info(f"Fetching episodes from RSS feed: {feed_url}")
         
-        feed = feedparser.parse(feed_url)
-        if not feed.entries:
+        try:
+            if self.use_lxml_parser:
+                entries = list(self._parse_with_lxml(feed_url))
+            else:
+                entries = list(self._iter_feed_entries(feed_url))
+        except _FEED_PARSE_ERRORS as e:
+            # feedparser tolerates malformed XML that ElementTree rejects
+            self.logger.debug(f"Streaming parse failed, parsing whole feed: {e}")
+            entries = feedparser.parse(feed_url).entries
+        except (URLError, OSError) as e:
+            # Unreachable feeds yield no episodes, as feedparser.parse() did, rather than raising
+            self.logger.error(f"Could not fetch RSS feed {feed_url}: {e}")
+            return []
+        
+        if not entries:
             self.logger.warning("No entries found in RSS feed")
             return []
         
@@ -48,7 +171,7 @@ class RSSProcessor:
         skipped_count = 0
         invalid_guid_count = 0
         
-        for entry in feed.entries:
+        for entry in entries:
             try:
                 # Extract and validate GUID
                 raw_guid = entry.get('id', '')
@@ -82,10 +205,10 @@ class RSSProcessor:
                 episode = EpisodeMetadata(
                     guid=normalized_guid,  # ✅ Now normalized
                     title=entry.get('title', 'No Title').strip(),
-                    publish_date=entry.get('published', ''),
+                    publish_date=parse_publish_date(entry.get('published', '')),
                     audio_url=audio_url,
                     episode_number=self._extract_episode_number(entry),
-                    description=entry.get('description', ''),
+                    description=description_text(entry.get('description', '')),
                     duration=self._extract_duration(entry)
                 )
                 
@@ -104,6 +227,94 @@ class RSSProcessor:
         
         return episodes
     
+    def _iter_feed_entries(self, feed_url: str) -> Iterator:
+        """
+        Stream feed entries one <item>/<entry> element at a time.
+        
+        Each element is handed to feedparser on its own, wrapped in a minimal
+        document, and then cleared, so memory stays O(item) and feedparser never
+        walks the whole multi-MB feed at once.
+        """
+        with self._open_feed(feed_url) as stream:
+            for _, elem in ET.iterparse(stream, events=('end',)):
+                tag = elem.tag.rsplit('}', 1)[-1]
+                if tag == 'item':
+                    document = b'<rss version="2.0"><channel>' + ET.tostring(elem) + b'</channel></rss>'
+                elif tag == 'entry' and elem.tag.startswith(f'{{{ATOM_NAMESPACE}}}'):
+                    document = f'<feed xmlns="{ATOM_NAMESPACE}">'.encode() + ET.tostring(elem) + b'</feed>'
+                else:
+                    continue
+                
+                parsed = feedparser.parse(document)
+                elem.clear()
+                if parsed.entries:
+                    yield parsed.entries[0]
+    
+    def _parse_with_lxml(self, feed_url: str) -> Iterator[feedparser.FeedParserDict]:
+        """
+        Stream feed entries with lxml, extracting only the fields fetch_episodes reads.
+        
+        Skips feedparser entirely (and with it _sanitize_html and relative URI
+        resolution, which dominate its profile); entries are returned as
+        FeedParserDicts so the extract helpers work on either parser's output.
+        """
+        atom_entry = f'{{{ATOM_NAMESPACE}}}entry'
+        with self._open_feed(feed_url) as stream:
+            for _, elem in etree.iterparse(stream, events=('end',), tag=('item', atom_entry)):
+                if elem.tag == atom_entry:
+                    entry = self._atom_entry(elem)
+                else:
+                    entry = self._rss_item(elem)
+                
+                # Free the element and the already-processed siblings before it
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+                yield entry
+    
+    @staticmethod
+    def _rss_item(item) -> feedparser.FeedParserDict:
+        itunes = f'{{{ITUNES_NAMESPACE}}}'
+        return feedparser.FeedParserDict(
+            id=(item.findtext('guid') or '').strip(),
+            title=(item.findtext('title') or '').strip(),
+            published=(item.findtext('pubDate') or '').strip(),
+            description=item.findtext('description') or item.findtext(f'{itunes}summary') or '',
+            itunes_episode=(item.findtext(f'{itunes}episode') or '').strip(),
+            itunes_duration=(item.findtext(f'{itunes}duration') or '').strip(),
+            # FeedParserDict derives .enclosures from rel="enclosure" links
+            links=[
+                feedparser.FeedParserDict(rel='enclosure', href=enc.get('url', ''),
+                                          type=enc.get('type', ''), length=enc.get('length', ''))
+                for enc in item.iterfind('enclosure')
+            ],
+        )
+    
+    @staticmethod
+    def _atom_entry(entry) -> feedparser.FeedParserDict:
+        atom = f'{{{ATOM_NAMESPACE}}}'
+        itunes = f'{{{ITUNES_NAMESPACE}}}'
+        return feedparser.FeedParserDict(
+            id=(entry.findtext(f'{atom}id') or '').strip(),
+            title=(entry.findtext(f'{atom}title') or '').strip(),
+            published=(entry.findtext(f'{atom}published') or entry.findtext(f'{atom}updated') or '').strip(),
+            description=entry.findtext(f'{atom}summary') or entry.findtext(f'{atom}content') or '',
+            itunes_episode=(entry.findtext(f'{itunes}episode') or '').strip(),
+            itunes_duration=(entry.findtext(f'{itunes}duration') or '').strip(),
+            links=[
+                feedparser.FeedParserDict(rel=link.get('rel', 'alternate'), href=link.get('href', ''),
+                                          type=link.get('type', ''), length=link.get('length', ''))
+                for link in entry.iterfind(f'{atom}link')
+            ],
+        )
+    
+    @staticmethod
+    def _open_feed(feed_url: str):
+        """Open a feed URL (http, https or file) or a local path as a binary stream."""
+        if urlparse(feed_url).scheme in ('http', 'https', 'file'):
+            return urlopen(Request(feed_url, headers={'User-Agent': 'askthegame-rss'}), timeout=FEED_TIMEOUT)
+        return open(feed_url, 'rb')
+    
     def _extract_audio_url(self, entry) -> Optional[str]:
         """Extract audio URL from RSS entry."""
         if not hasattr(entry, 'enclosures'): 
@@ -125,8 +336,7 @@ class RSSProcessor:
             return False
         
         # Check for audio file extensions
-        audio_extensions = ['.mp3', '.wav', '.m4a', '.mp4', '.aac']
-        if not any(ext in url.lower() for ext in audio_extensions):
+        if not self._AUDIO_EXT_RE.search(url):
             self.logger.debug(f"Audio URL may not contain valid audio extension: {url}")
         
         return True
@@ -140,7 +350,7 @@ class RSSProcessor:
         
         # Try to extract from title
         title = entry.get('title', '')
-        match = re.search(r'Ep\s*(\d+)', title, re.IGNORECASE)
+        match = self._EP_NUM_RE.search(title)
         if match:
             return int(match.group(1))
         
@@ -167,5 +377,4 @@ class RSSProcessor:
     
     def is_rerun_episode(self, title: str) -> bool:
         """Check if episode is a rerun based on title keywords."""
-        rerun_keywords = self.pipeline_config['rerun_keywords']
-        return any(keyword in title.lower() for keyword in rerun_keywords)
\ No newline at end of file
+        return bool(self._rerun_re and self._rerun_re.search(title))
\ No newline at end of file
@@ -0,0 +1,335 @@
+"""
+Filename: speaker_index.py
+
+Description:
+    In-process approximate nearest-neighbour index over speaker embeddings.
+    Fronts the Supabase embedding index so per-utterance speaker lookups use an
+    HNSW graph (O(log n)) instead of a linear cosine scan over the whole table.
+    Falls back to an exact normalized matrix search when hnswlib is not installed.
+
+Usage:
+    from askthegame.speaker.speaker_index import SpeakerReferenceIndex
+
+    index = SpeakerReferenceIndex(dim=OPENAI_EMBEDDING_DIM)
+    index.add_items(embeddings, labels)
+    labels, scores = index.query(utterance_embeddings, k=1)
+    speakers = index.match(utterance_embeddings, threshold=0.8)
+    matches = index.search(speaker_embeddings, top_k=5, min_similarity=0.7)
+    index.save("data/speaker_embeddings.hnsw")
+
+Created: 2026-10-15
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ._numba_kernels import HAVE_NUMBA, avg_normalize, best_cosine_match, cosine_topk
+
+try:
+    import hnswlib
+except ImportError:  # pragma: no cover - hnswlib is optional
+    hnswlib = None
+
+# Above this many references a BLAS sgemm beats the numba kernel
+NUMBA_MATCH_MAX_REFERENCES = 32
+
+
+def normalize_rows(vectors, dim: Optional[int] = None) -> np.ndarray:
+    """Return vectors as a contiguous (N, dim) float32 matrix with unit rows."""
+    matrix = np.array(vectors, dtype=np.float32, order="C", ndmin=2)
+    if dim is not None:
+        matrix = matrix.reshape(-1, dim)
+    return _normalize_inplace(matrix)
+
+
+def _normalize_inplace(matrix: np.ndarray) -> np.ndarray:
+    """Scale the rows of a float32 matrix to unit length without copying it."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+def cosine_match(
+    queries, references, threshold: float = 0.0, references_normalized: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Match every query embedding to its most similar reference in one batch.
+
+    Both inputs are (N, D) / (M, D) matrices. Small reference sets are scored by the
+    compiled numba kernel when available; otherwise normalizing rows turns the whole
+    (N, M) cosine similarity table into a single sgemm instead of N*M Python dot products.
+
+    Pass references_normalized=True for a reference matrix that already has unit
+    rows (as cached by SpeakerReferenceIndex) so it is not copied and rescaled per call.
+
+    Returns:
+        Tuple of (indices, scores): indices[i] is the best reference row for query i,
+        or -1 when its score is below threshold
+    """
+    queries = np.array(queries, dtype=np.float32, order="C", ndmin=2)
+    references = np.ascontiguousarray(references, dtype=np.float32).reshape(
+        -1, queries.shape[1]
+    )
+    if not len(queries) or not len(references):
+        return np.full(len(queries), -1, dtype=np.int64), np.zeros(
+            len(queries), dtype=np.float32
+        )
+
+    if HAVE_NUMBA and len(references) <= NUMBA_MATCH_MAX_REFERENCES:
+        # Fused kernel keeps only the best score per row instead of the (N, M) table
+        indices, scores = best_cosine_match(queries, references)
+    else:
+        if not references_normalized:
+            references = normalize_rows(references)
+        # queries is already a private copy, so normalize it in place
+        similarities = _normalize_inplace(queries) @ references.T
+        indices = similarities.argmax(axis=1)
+        scores = similarities[np.arange(len(queries)), indices]
+    indices[scores < threshold] = -1
+    return indices, scores
+
+
+def mean_embedding(embeddings) -> np.ndarray:
+    """Average a speaker's sample embeddings into one unit-length voiceprint."""
+    matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+    if HAVE_NUMBA:
+        return avg_normalize(matrix.reshape(len(matrix), -1))
+    return _normalize_inplace(matrix.mean(axis=0, keepdims=True))[0]
+
+
+def noisy_samples(
+    reference: np.ndarray,
+    count: int,
+    scale: float = 0.01,
+    out: Optional[np.ndarray] = None,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """
+    Fill count rows of out with reference plus Gaussian noise of the given scale.
+
+    Callers that simulate sample embeddings per speaker can keep one float32
+    (max_count, D) buffer and reuse it, instead of allocating a noise array and
+    a reference copy for every sample.
+    """
+    if out is None:
+        out = np.empty((count, reference.shape[-1]), dtype=np.float32)
+    samples = out[:count]
+    (rng or np.random.default_rng()).standard_normal(out=samples, dtype=np.float32)
+    samples *= scale
+    samples += reference
+    return samples
+
+
+def quantize_int8(vectors) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize embeddings to int8 with one float32 scale per row.
+
+    Rows are unit-normalized first, so cosine similarity survives the rounding and
+    a 1536-dim vector shrinks from 6 KB to 1.5 KB plus its scale.
+
+    Returns:
+        Tuple of (codes, scales) where codes is an (N, D) int8 matrix and
+        codes[i] * scales[i] approximates the normalized row i
+    """
+    matrix = normalize_rows(vectors)
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.rint(matrix / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize_int8(codes, scales) -> np.ndarray:
+    """Expand int8 codes written by quantize_int8() back to a float32 matrix."""
+    return np.asarray(codes, dtype=np.float32) * np.asarray(
+        scales, dtype=np.float32
+    ).reshape(-1, 1)
+
+
+class SpeakerReferenceIndex:
+    """Cosine-similarity index mapping speaker embeddings to labels."""
+
+    def __init__(
+        self,
+        dim: int,
+        max_elements: int = 10000,
+        ef_construction: int = 200,
+        m: int = 16,
+        ef_search: int = 64,
+    ):
+        self.dim = dim
+        self.labels: List[str] = []
+        self.cache_key: Optional[str] = None
+
+        # Episode workers share one process-wide index; hnsw ids come from
+        # len(labels), so adds must not interleave with each other or queries
+        self._lock = threading.RLock()
+
+        # Exact fallback keeps unit-normalized vectors in a single matrix
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+
+        self._hnsw = None
+        if hnswlib is not None:
+            self._hnsw = hnswlib.Index(space="cosine", dim=dim)
+            self._hnsw.init_index(
+                max_elements=max_elements, ef_construction=ef_construction, M=m
+            )
+            self._hnsw.set_ef(ef_search)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def _normalize(self, vectors) -> np.ndarray:
+        return normalize_rows(vectors, self.dim)
+
+    def add_items(self, vectors, labels: Sequence[str]) -> None:
+        """Add embeddings with their speaker labels."""
+        matrix = self._normalize(vectors)
+        if matrix.shape[0] != len(labels):
+            raise ValueError(f"Got {matrix.shape[0]} vectors for {len(labels)} labels")
+        if not len(labels):
+            return
+
+        with self._lock:
+            if self._hnsw is not None:
+                needed = len(self.labels) + matrix.shape[0]
+                if needed > self._hnsw.get_max_elements():
+                    self._hnsw.resize_index(
+                        max(needed, 2 * self._hnsw.get_max_elements())
+                    )
+                ids = np.arange(len(self.labels), needed)
+                self._hnsw.add_items(matrix, ids)
+            else:
+                self._vectors = np.vstack((self._vectors, matrix))
+
+            self.labels.extend(labels)
+
+    def query(self, vectors, k: int = 1) -> Tuple[List[List[str]], np.ndarray]:
+        """
+        Find the k most similar reference embeddings for each query vector.
+
+        Returns:
+            Tuple of (labels, scores) where labels[i] lists the k best labels for
+            query i and scores is an (N, k) array of cosine similarities
+        """
+        queries = self._normalize(vectors)
+        with self._lock:
+            k = min(k, len(self.labels))
+            if k == 0:
+                return [[] for _ in range(queries.shape[0])], np.empty(
+                    (queries.shape[0], 0), dtype=np.float32
+                )
+
+            if self._hnsw is not None:
+                ids, distances = self._hnsw.knn_query(queries, k=k)
+                scores = 1.0 - distances
+            elif HAVE_NUMBA and len(self.labels) <= NUMBA_MATCH_MAX_REFERENCES:
+                # Both sides are unit-normalized, so the kernel only needs dot products
+                ids, scores = cosine_topk(queries, self._vectors, k)
+            else:
+                similarities = queries @ self._vectors.T
+                ids = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+                top = np.take_along_axis(similarities, ids, axis=1)
+                order = np.argsort(-top, axis=1)
+                ids = np.take_along_axis(ids, order, axis=1)
+                scores = np.take_along_axis(top, order, axis=1)
+
+            labels = [[self.labels[i] for i in row] for row in ids.tolist()]
+            return labels, scores
+
+    def match(self, vectors, threshold: float = 0.0) -> List[Optional[str]]:
+        """
+        Assign a speaker label to every row of an (N, dim) utterance matrix at once.
+
+        Returns one label per row, or None when the best match scores below threshold.
+        """
+        if self._hnsw is not None:
+            labels, scores = self.query(vectors, k=1)
+            return [
+                row[0] if row and score[0] >= threshold else None
+                for row, score in zip(labels, scores.tolist())
+            ]
+
+        with self._lock:
+            indices, _ = cosine_match(
+                vectors, self._vectors, threshold, references_normalized=True
+            )
+            return [self.labels[i] if i >= 0 else None for i in indices.tolist()]
+
+    def search(
+        self, vectors, top_k: int = 5, min_similarity: float = 0.0
+    ) -> List[List[dict]]:
+        """
+        Batched counterpart of SupabaseEmbeddingIndex.search_similar().
+
+        Scores every row of an (N, dim) matrix in one call, so a caller looking up
+        N speakers pays one in-process query instead of N Supabase round-trips.
+
+        Returns:
+            One list per query row of {'speaker_label', 'similarity'} dicts, best
+            first, keeping only matches scoring at least min_similarity
+        """
+        labels, scores = self.query(vectors, k=top_k)
+        return [
+            [
+                {"speaker_label": label, "similarity": score}
+                for label, score in zip(row_labels, row_scores)
+                if score >= min_similarity
+            ]
+            for row_labels, row_scores in zip(labels, scores.tolist())
+        ]
+
+    def save(self, path: str) -> None:
+        """Persist the index and its labels next to each other."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            if self._hnsw is not None:
+                self._hnsw.save_index(str(path))
+            else:
+                with open(path, "wb") as f:
+                    np.save(f, self._vectors)
+
+            with open(f"{path}.labels.json", "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "dim": self.dim,
+                        "hnsw": self._hnsw is not None,
+                        "cache_key": self.cache_key,
+                        "labels": self.labels,
+                    },
+                    f,
+                )
+
+    @classmethod
+    def load(cls, path: str, ef_search: int = 64) -> "SpeakerReferenceIndex":
+        """Load an index written by save()."""
+        with open(f"{path}.labels.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        index = cls(meta["dim"], ef_search=ef_search)
+        if meta["hnsw"]:
+            if hnswlib is None:
+                raise RuntimeError(
+                    f"{path} is an HNSW index but hnswlib is not installed"
+                )
+            index._hnsw = hnswlib.Index(space="cosine", dim=meta["dim"])
+            index._hnsw.load_index(str(path), max_elements=max(len(meta["labels"]), 1))
+            index._hnsw.set_ef(ef_search)
+        else:
+            with open(path, "rb") as f:
+                vectors = np.load(f)
+            if index._hnsw is not None:
+                index._hnsw.resize_index(max(len(meta["labels"]), 1))
+                index._hnsw.add_items(vectors, np.arange(len(meta["labels"])))
+            else:
+                index._vectors = vectors
+
+        index.labels = meta["labels"]
+        index.cache_key = meta.get("cache_key")
+        return index
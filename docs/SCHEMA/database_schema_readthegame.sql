@@ -32,6 +32,9 @@ create table if not exists utterances (
   confidence numeric
 );
 
-create index if not exists idx_transcripts_episode on transcripts(episode_guid);
+-- Covering: the guid -> transcript id lookup is answered from the index alone
+drop index if exists idx_transcripts_episode;
+create index if not exists idx_transcripts_episode_id on transcripts(episode_guid) include (id, created_at);
 create index if not exists idx_utterances_transcript on utterances(transcript_id);
+-- Matches get_transcript's filter + order by, so utterances come back without a sort
 create index if not exists idx_utterances_seek on utterances(transcript_id, start_sec);
@@ -1,19 +1,24 @@
-from fastapi import FastAPI, HTTPException, Depends
+import hashlib
+
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import bindparam, select
 
 from src.db import SessionLocal
 from src.models.db_models import EpisodeRow, TranscriptRow, UtteranceRow
 
 app = FastAPI(title="Read The Game")
 
-def get_db():
-    db = SessionLocal()
-    try:
+# Episodes and transcripts only change when ingestion runs, so proxies and
+# browsers may reuse a response for a while and revalidate it by ETag after
+CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=600"
+
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 @app.get("/health")
 def health():
@@ -39,40 +44,109 @@ class TranscriptOut(BaseModel):
     guid: str
     utterances: list[UtteranceOut]
 
+# ---- HTTP caching ----
+def _etag(*parts) -> str:
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=8).hexdigest()
+    return f'"{digest}"'
+
+def _not_modified(request: Request, response: Response, etag: str) -> Response | None:
+    """Set the cache headers and return a 304 when the client already has etag."""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    response.headers.update(headers)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in (
+        tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+    )):
+        return Response(status_code=304, headers=headers)
+    return None
+
+# ---- Statements ----
+# Built once at import: each request only binds its parameters, and the compiled
+# SQL is a cache hit instead of a fresh expression tree per call
+_TRANSCRIPT_STMT = (
+    select(TranscriptRow.id, TranscriptRow.created_at)
+    .where(TranscriptRow.episode_guid == bindparam("guid"))
+    .limit(1)
+)
+
+# Rows come back ordered server-side (idx_utterances_seek) as plain column tuples
+_UTTERANCES_STMT = (
+    select(
+        UtteranceRow.start_sec,
+        UtteranceRow.end_sec,
+        UtteranceRow.text,
+        UtteranceRow.speaker_label,
+        UtteranceRow.confidence,
+    )
+    .where(UtteranceRow.transcript_id == bindparam("tid"))
+    .order_by(UtteranceRow.start_sec)
+    .execution_options(yield_per=1000)
+)
+
 # ---- Endpoints ----
 @app.get("/episodes/{guid}", response_model=EpisodeOut)
-def get_episode(guid: str, db: Session = Depends(get_db)):
-    row = db.get(EpisodeRow, guid)
+async def get_episode(guid: str, request: Request, response: Response,
+                      db: AsyncSession = Depends(get_db)):
+    row = await db.get(EpisodeRow, guid)
     if not row:
         raise HTTPException(404, "Not found")
-    return EpisodeOut(
-        guid=str(row.guid),
-        title=row.title,
-        publish_date=row.publish_date.isoformat() if row.publish_date else None,
-        audio_url=row.audio_url,
-        duration_sec=row.duration_sec,
-        summary=row.summary,
-    )
+    if not_modified := _not_modified(request, response, _etag(row.guid, row.updated_at)):
+        return not_modified
+    # Plain dict, as for transcripts: response_model validates it once on the way out
+    return {
+        "guid": str(row.guid),
+        "title": row.title,
+        "publish_date": row.publish_date.isoformat() if row.publish_date else None,
+        "audio_url": row.audio_url,
+        "duration_sec": row.duration_sec,
+        "summary": row.summary,
+    }
 
 @app.get("/episodes/{guid}/transcript", response_model=TranscriptOut)
-def get_transcript(guid: str, db: Session = Depends(get_db)):
-    tr = db.execute(select(TranscriptRow).where(TranscriptRow.episode_guid == guid)).scalars().first()
-    if not tr:
+async def get_transcript(guid: str, request: Request, response: Response,
+                         db: AsyncSession = Depends(get_db)):
+    transcript = (await db.execute(_TRANSCRIPT_STMT, {"guid": guid})).first()
+    if transcript is None:
+        raise HTTPException(404, "Not found")
+    # Transcripts are written once per run, so id + created_at identifies the content;
+    # a revalidation hit skips the utterance fetch and encode entirely
+    tid, created_at = transcript
+    if not_modified := _not_modified(request, response, _etag(tid, created_at)):
+        return not_modified
+
+    rows = await db.stream(_UTTERANCES_STMT, {"tid": tid})
+    # Plain dicts: response_model validates and serializes them once, in pydantic-core
+    utterances = [
+        {
+            "start": float(start),
+            "end": float(end),
+            "text": text,
+            "speaker": speaker,
+            "confidence": float(confidence) if confidence is not None else None,
+        } async for start, end, text, speaker, confidence in rows
+    ]
+    return {"guid": guid, "utterances": utterances}
+
+@app.get("/episodes/{guid}/transcript.ndjson")
+async def stream_transcript(guid: str, request: Request, response: Response,
+                            db: AsyncSession = Depends(get_db)):
+    """Same utterances as /transcript, one JSON object per line as rows arrive."""
+    transcript = (await db.execute(_TRANSCRIPT_STMT, {"guid": guid})).first()
+    if transcript is None:
         raise HTTPException(404, "Not found")
-    utts = db.execute(
-        select(UtteranceRow)
-        .where(UtteranceRow.transcript_id == tr.id)
-        .order_by(UtteranceRow.start_sec)
-    ).scalars().all()
-    return TranscriptOut(
-        guid=guid,
-        utterances=[
-            UtteranceOut(
-                start=float(u.start_sec),
-                end=float(u.end_sec),
-                text=u.text,
-                speaker=u.speaker_label,
-                confidence=float(u.confidence) if u.confidence is not None else None,
-            ) for u in utts
-        ],
-    )
\ No newline at end of file
+    tid, created_at = transcript
+    if not_modified := _not_modified(request, response, _etag(tid, created_at, "ndjson")):
+        return not_modified
+
+    async def lines():
+        # Neither side holds more than a yield_per batch of the transcript
+        async for start, end, text, speaker, confidence in await db.stream(_UTTERANCES_STMT, {"tid": tid}):
+            yield to_json({
+                "start": float(start),
+                "end": float(end),
+                "text": text,
+                "speaker": speaker,
+                "confidence": float(confidence) if confidence is not None else None,
+            }) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers=dict(response.headers))
@@ -1,8 +1,30 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 import os
 
-DATABASE_URL = os.environ.get("DATABASE_URL", "postgresql+psycopg://rtg:rtg@db:5432/rtg")
+DATABASE_URL = os.environ.get("DATABASE_URL", "postgresql+asyncpg://rtg:rtg@db:5432/rtg")
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
\ No newline at end of file
+# Pool sizing: pool_size ~ queries expected to be in flight at once per worker;
+# max_overflow absorbs bursts above that and is closed again once they pass
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "40"))
+
+# Prepared statements kept per connection, so the hot episode/transcript
+# queries are parsed and planned by Postgres once per connection, not per request
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", "256"))
+
+# Existing postgresql:// / +psycopg / +psycopg2 URLs keep working; the async engine needs asyncpg
+engine = create_async_engine(
+    make_url(DATABASE_URL).set(drivername="postgresql+asyncpg"),
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    # Recycle before idle-connection timeouts on the server or a proxy drop them
+    pool_recycle=1800,
+    connect_args={
+        "server_settings": {"application_name": "rtg-api"},
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    },
+)
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
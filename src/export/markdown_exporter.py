@@ -5,13 +5,92 @@ Converts JSON transcript artifacts to structured Markdown files.
 
 import json
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 import logging
 
+# orjson encodes/decodes several times faster than stdlib json (if installed)
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
 logger = logging.getLogger(__name__)
 
+# Tried in order; the first pattern that matches anywhere in the title wins
+_EPISODE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"Episode\s+(\d+)",
+        r"Ep\s+(\d+)",
+        r"#(\d+)",
+        r"(\d+)\s*[-–]\s*",
+    )
+]
+
+
+def _json_dumps(data: Any) -> bytes:
+    """Encode data as indented UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+# Zero-padded "00".."99": a list lookup is several times cheaper than a :02d format
+# spec, and runs twice per transcript segment
+_TWO_DIGITS = [f"{n:02d}" for n in range(100)]
+
+# List items (transcript segments) encoded per chunk when writing transcript.json
+JSON_WRITE_BATCH = 256
+
+
+def _iter_json_chunks(data: Any) -> Iterator[bytes]:
+    """
+    Yield the _json_dumps() encoding of data piecewise.
+
+    Top-level lists (the segments) are encoded JSON_WRITE_BATCH items at a time
+    and re-indented one level, so the bytes match a single _json_dumps() call
+    while only one batch is ever held encoded in memory.
+    """
+    if not isinstance(data, dict) or not data or not all(isinstance(key, str) for key in data):
+        yield _json_dumps(data)
+        return
+
+    yield b"{"
+    separator = b"\n"
+    for key, value in data.items():
+        yield separator + b"  " + _json_dumps(key) + b": "
+        separator = b",\n"
+        if isinstance(value, list) and value:
+            yield b"["
+            item_separator = b"\n"
+            for start in range(0, len(value), JSON_WRITE_BATCH):
+                # Drop the batch's own "[\n" and "\n]", keep its items
+                items = _json_dumps(value[start:start + JSON_WRITE_BATCH])[2:-2]
+                yield item_separator + b"  " + items.replace(b"\n", b"\n  ")
+                item_separator = b",\n"
+            yield b"\n  ]"
+        else:
+            yield _json_dumps(value).replace(b"\n", b"\n  ")
+    yield b"\n}"
+
+
+def _write_json(path: Path, data: Any) -> None:
+    """Write data as indented JSON through a 1 MiB buffer, one chunk at a time."""
+    with open(path, "wb", buffering=1 << 20) as f:
+        f.writelines(_iter_json_chunks(data))
+
+
+def _json_loads(data: bytes) -> Any:
+    """Decode UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 class MarkdownExporter:
     """Converts episode transcript JSON to formatted Markdown."""
@@ -26,6 +105,9 @@ class MarkdownExporter:
         self.artifacts_dir = Path(artifacts_dir)
         self.artifacts_dir.mkdir(parents=True, exist_ok=True)
 
+        # Episode directories this exporter has already created
+        self._created_dirs: set[Path] = set()
+
     def export_episode(self, transcript_json: Dict[str, Any]) -> str:
         """
         Convert a transcript JSON to Markdown format.
@@ -44,28 +126,31 @@ class MarkdownExporter:
         duration = transcript_json.get("duration", 0)
         summary = transcript_json.get("summary", "")
 
-        # Extract speakers
-        speakers = self._extract_speakers(transcript_json)
+        # Format segment lines and collect speakers in a single pass
+        segment_lines, speakers, primary_speaker = self._walk_segments(transcript_json.get("segments", []))
 
         # Build front matter
-        front_matter = self._build_front_matter(
+        lines = self._front_matter_lines(
             episode_id=episode_id,
             title=title,
             date=date,
             audio_url=audio_url,
             duration=duration,
             summary=summary,
-            speakers=speakers
+            speakers=speakers,
+            primary_speaker=primary_speaker
         )
 
         # Build body content
-        body = self._build_body(
+        lines += self._body_lines(
             title=title,
             audio_url=audio_url,
-            segments=transcript_json.get("segments", [])
+            segment_lines=segment_lines
         )
 
-        return f"{front_matter}\n{body}"
+        # One join for the whole document instead of joining each part and then
+        # concatenating the (transcript-sized) results again
+        return "\n".join(lines)
 
     def _extract_speakers(self, transcript_json: Dict[str, Any]) -> List[Dict[str, str]]:
         """Extract unique speakers from transcript segments."""
@@ -73,21 +158,78 @@ class MarkdownExporter:
 
         for segment in transcript_json.get("segments", []):
             speaker_id = segment.get("speaker_id_global", segment.get("speaker", "unknown"))
-            speaker_name = segment.get("speaker_name", speaker_id)
 
+            # First-seen name wins, so it is only looked up for a new speaker
             if speaker_id not in speakers_dict:
                 speakers_dict[speaker_id] = {
                     "id": speaker_id,
-                    "display_name": speaker_name
+                    "display_name": segment.get("speaker_name", speaker_id)
                 }
 
-        # Ensure Alex Hormozi is listed first if present
-        speakers_list = list(speakers_dict.values())
-        speakers_list.sort(key=lambda s: (s["id"] != "alex_hormozi", s["id"]))
+        return self._order_speakers(speakers_dict)
 
-        return speakers_list
+    def _walk_segments(
+        self,
+        segments: List[Dict[str, Any]]
+    ) -> Tuple[List[str], List[Dict[str, str]], Optional[Dict[str, str]]]:
+        """
+        Format transcript lines and collect unique speakers in one pass over segments.
+
+        Returns:
+            Tuple of (segment_lines, speakers, primary_speaker): each non-empty segment
+            contributes its formatted line plus a blank separator; speakers as in
+            _extract_speakers(); primary_speaker is the front matter guest, or None
+            when there are no speakers
+        """
+        speakers_dict = {}
+        alex_ids = []
+        segment_lines = []
+        extend = segment_lines.extend
 
-    def _build_front_matter(
+        # Inlined _extract_speakers/_format_segment: this loop runs once per utterance
+        for segment in segments:
+            get = segment.get
+            speaker = get("speaker", "unknown")
+            speaker_id = get("speaker_id_global", speaker)
+            if speaker_id not in speakers_dict:
+                speakers_dict[speaker_id] = {
+                    "id": speaker_id,
+                    "display_name": get("speaker_name", speaker_id)
+                }
+                if "alex" in speaker_id.lower():
+                    alex_ids.append(speaker_id)
+
+            text = get("text", "")
+            if not text.strip():
+                continue
+            speaker_name = get("speaker_name", get("speaker", "Unknown"))
+            minutes, seconds = divmod(int(get("start", 0)), 60)
+            mm = _TWO_DIGITS[minutes] if 0 <= minutes < 100 else f"{minutes:02d}"
+            extend((f"**{speaker_name} [{mm}:{_TWO_DIGITS[seconds]}]:** {text}", ""))
+
+        speakers = self._order_speakers(speakers_dict)
+
+        # First "alex" id in speaker order (alex_hormozi sorts first), else the first speaker
+        if alex_ids:
+            primary_speaker = speakers_dict.get("alex_hormozi") or speakers_dict[min(alex_ids)]
+        else:
+            primary_speaker = speakers[0] if speakers else None
+
+        return segment_lines, speakers, primary_speaker
+
+    @staticmethod
+    def _order_speakers(speakers_dict: Dict[str, Dict[str, str]]) -> List[Dict[str, str]]:
+        # Ensure Alex Hormozi is listed first if present; ids are the dict keys,
+        # so he can be picked out directly and only the rest need sorting
+        host = speakers_dict.get("alex_hormozi")
+        speakers_list = sorted(
+            (s for speaker_id, s in speakers_dict.items() if speaker_id != "alex_hormozi"),
+            key=itemgetter("id")
+        )
+
+        return [host] + speakers_list if host else speakers_list
+
+    def _front_matter_lines(
         self,
         episode_id: str,
         title: str,
@@ -95,48 +237,47 @@ class MarkdownExporter:
         audio_url: str,
         duration: int,
         summary: str,
-        speakers: List[Dict[str, str]]
-    ) -> str:
-        """Build YAML front matter for the Markdown file."""
-        lines = ["---"]
-        lines.append(f'episode_id: "{episode_id}"')
-        lines.append(f'title: "{title}"')
-        lines.append(f'date: "{date}"')
+        speakers: List[Dict[str, str]],
+        primary_speaker: Optional[Dict[str, str]] = None
+    ) -> List[str]:
+        """Build the YAML front matter lines for the Markdown file."""
+        lines = [
+            "---",
+            f'episode_id: "{episode_id}"',
+            f'title: "{title}"',
+            f'date: "{date}"',
+        ]
 
         # Primary guest (usually Alex)
         if speakers:
-            primary_speaker = next(
-                (s for s in speakers if "alex" in s["id"].lower()),
-                speakers[0] if speakers else {"display_name": "Unknown"}
-            )
+            if primary_speaker is None:
+                primary_speaker = next((s for s in speakers if "alex" in s["id"].lower()), speakers[0])
             lines.append(f'guest: "{primary_speaker["display_name"]}"')
 
         lines.append(f'audio_url: "{audio_url}"')
 
         if summary:
             lines.append("summary: |")
-            for line in summary.split("\n"):
-                lines.append(f"  {line}")
+            lines += [f"  {line}" for line in summary.split("\n")]
 
         lines.append(f"duration: {duration}   # in seconds")
 
         if speakers:
             lines.append("speakers:")
             for speaker in speakers:
-                lines.append(f'  - id: "{speaker["id"]}"')
-                lines.append(f'    display_name: "{speaker["display_name"]}"')
+                lines += (f'  - id: "{speaker["id"]}"', f'    display_name: "{speaker["display_name"]}"')
 
         lines.append("---")
 
-        return "\n".join(lines)
+        return lines
 
-    def _build_body(
+    def _body_lines(
         self,
         title: str,
         audio_url: str,
-        segments: List[Dict[str, Any]]
-    ) -> str:
-        """Build the body content of the Markdown file."""
+        segment_lines: List[str]
+    ) -> List[str]:
+        """Build the body lines of the Markdown file from formatted segment lines."""
         lines = []
 
         # Title
@@ -160,28 +301,14 @@ class MarkdownExporter:
         lines.append("## Transcript")
         lines.append("")
 
-        # Format segments
-        for segment in segments:
-            formatted_segment = self._format_segment(segment)
-            if formatted_segment:
-                lines.append(formatted_segment)
-                lines.append("")
+        lines.extend(segment_lines)
 
-        return "\n".join(lines)
+        return lines
 
     def _extract_episode_number(self, title: str) -> Optional[str]:
         """Extract episode number from title if present."""
-        import re
-
-        patterns = [
-            r"Episode\s+(\d+)",
-            r"Ep\s+(\d+)",
-            r"#(\d+)",
-            r"(\d+)\s*[-–]\s*",
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, title, re.IGNORECASE)
+        for pattern in _EPISODE_PATTERNS:
+            match = pattern.search(title)
             if match:
                 return match.group(1)
 
@@ -197,9 +324,9 @@ class MarkdownExporter:
             return ""
 
         # Format timestamp as [MM:SS]
-        minutes = int(start_time // 60)
-        seconds = int(start_time % 60)
-        timestamp = f"[{minutes:02d}:{seconds:02d}]"
+        minutes, seconds = divmod(int(start_time), 60)
+        mm = _TWO_DIGITS[minutes] if 0 <= minutes < 100 else f"{minutes:02d}"
+        timestamp = f"[{mm}:{_TWO_DIGITS[seconds]}]"
 
         return f"**{speaker_name} {timestamp}:** {text}"
 
@@ -222,20 +349,23 @@ class MarkdownExporter:
         """
         # Create episode directory
         episode_dir = self.artifacts_dir / "episodes" / episode_id
-        episode_dir.mkdir(parents=True, exist_ok=True)
+        if episode_dir not in self._created_dirs:
+            episode_dir.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(episode_dir)
 
         # Save JSON
         json_path = episode_dir / "transcript.json"
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(transcript_json, f, indent=2, ensure_ascii=False)
+        _write_json(json_path, transcript_json)
 
         # Generate and save Markdown
         if markdown_content is None:
             markdown_content = self.export_episode(transcript_json)
 
+        # Encode once and issue a single write() instead of streaming the text
+        # through the text-mode encoder in 8 KiB chunks
         markdown_path = episode_dir / "transcript.md"
-        with open(markdown_path, "w", encoding="utf-8") as f:
-            f.write(markdown_content)
+        with open(markdown_path, "wb") as f:
+            f.write(markdown_content.encode("utf-8"))
 
         logger.info(f"Saved artifacts for episode {episode_id}:")
         logger.info(f"  JSON: {json_path}")
@@ -243,27 +373,61 @@ class MarkdownExporter:
 
         return json_path, markdown_path
 
+    def save_episodes(
+        self,
+        items: Iterable[Tuple[str, Dict[str, Any]]],
+        max_workers: Optional[int] = None
+    ) -> List[Tuple[Path, Path]]:
+        """
+        Save artifacts for many episodes concurrently (e.g. a back-catalog re-export).
+
+        File writes and orjson encoding release the GIL, so episodes overlap on a
+        small thread pool.
 
-def export_markdown_from_json(json_path: str, output_path: Optional[str] = None) -> str:
+        Args:
+            items: (episode_id, transcript_json) pairs
+            max_workers: Thread count (default: min(8, CPU count))
+
+        Returns:
+            (json_path, markdown_path) per item, in input order; the first failing
+            episode's exception is re-raised
+        """
+        workers = max_workers or min(8, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda item: self.save_episode(*item), items))
+
+
+def export_markdown_from_json(
+    json_path: str,
+    output_path: Optional[str] = None,
+    save_json_alongside: bool = False
+) -> str:
     """
     Convenience function to convert a JSON file to Markdown.
 
     Args:
         json_path: Path to transcript JSON file
         output_path: Optional output path for Markdown file
+        save_json_alongside: Also write the parsed transcript next to output_path
+            (same name, .json suffix), saving a separate save_episode() round-trip
 
     Returns:
         Markdown content
     """
-    with open(json_path, "r", encoding="utf-8") as f:
-        transcript_json = json.load(f)
+    with open(json_path, "rb") as f:
+        transcript_json = _json_loads(f.read())
 
     exporter = MarkdownExporter()
     markdown = exporter.export_episode(transcript_json)
 
     if output_path:
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(markdown)
+        with open(output_path, "wb") as f:
+            f.write(markdown.encode("utf-8"))
         logger.info(f"Exported Markdown to {output_path}")
 
+        if save_json_alongside:
+            json_output_path = Path(output_path).with_suffix(".json")
+            _write_json(json_output_path, transcript_json)
+            logger.info(f"Exported JSON to {json_output_path}")
+
     return markdown
\ No newline at end of file
@@ -5,24 +5,16 @@ Inngest Function Stubs wired to real service call sites.
 """
 from __future__ import annotations
 
+import json
 import os
-from typing import Dict, Any, List
-
-# Deepgram SDK placeholder (import if installed)
-try:
-    from deepgram import Deepgram
-except Exception:  # pragma: no cover
-    Deepgram = None  # type: ignore
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
 
 # HTTP for pyannote Precision-2 (if using REST); otherwise use their SDK if/when available
 import requests
 
-# Supabase (python client)
-try:
-    from supabase import create_client, Client  # type: ignore
-except Exception:  # pragma: no cover
-    create_client = None
-    Client = None  # type: ignore
+# Deepgram and Supabase SDKs are imported inside their factories below, so workers
+# running only some steps (e.g. export_markdown) don't pay for loading them
 
 from src.pipeline.speaker_id_service import SpeakerMemory, SpeakerPlatformClient
 from src.export.markdown_exporter import MarkdownExporter
@@ -31,17 +23,29 @@ from src.export.markdown_exporter import MarkdownExporter
 # Helpers / Config
 # ----------------
 
+# SDK clients are built once per process and shared by every step, so each step
+# reuses the same connection pool instead of re-reading credentials and handshaking.
+# Missing-config errors are raised, not cached, so they are re-checked next call.
+# The SDK import happens on that first call too.
+# A race between two threads on first use at worst builds one extra client.
+@lru_cache(maxsize=1)
 def _supabase() -> Any:
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_ANON_KEY")
     if not (url and key):
         raise RuntimeError("Missing SUPABASE_URL or SUPABASE_ANON_KEY")
-    if not create_client:
+    try:
+        from supabase import create_client  # type: ignore
+    except Exception:  # pragma: no cover
         raise RuntimeError("supabase client not installed")
     return create_client(url, key)
 
+@lru_cache(maxsize=1)
 def _deepgram() -> Any:
-    if not Deepgram:
+    # Deepgram SDK placeholder (import if installed)
+    try:
+        from deepgram import Deepgram
+    except Exception:  # pragma: no cover
         raise RuntimeError("deepgram-sdk not installed")
     key = os.getenv("DEEPGRAM_API_KEY")
     if not key:
@@ -54,6 +58,25 @@ def _pyannote_headers() -> Dict[str, str]:
         raise RuntimeError("Missing PYANNOTE_API_KEY")
     return {"Authorization": f"Bearer {key}", "Content-Type": "application/json"}
 
+# Supabase Storage bucket for transcripts handed between steps; unset keeps them inline in the event
+TRANSCRIPT_BUCKET = os.getenv("TRANSCRIPT_BUCKET")
+
+def _store_transcript(episode_id: str, transcript: List[Dict[str, Any]]) -> str:
+    """Upload a transcript to TRANSCRIPT_BUCKET and return its "<bucket>/<path>" URI."""
+    path = f"transcripts/{episode_id}.json"
+    body = json.dumps(transcript, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    _supabase().storage.from_(TRANSCRIPT_BUCKET).upload(
+        path, body, {"content-type": "application/json", "upsert": "true"}
+    )
+    return f"{TRANSCRIPT_BUCKET}/{path}"
+
+def _event_transcript(event: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The event's transcript, inline or downloaded from its transcript_uri."""
+    if "transcript" in event or "transcript_uri" not in event:
+        return event.get("transcript", [])
+    bucket, path = event["transcript_uri"].split("/", 1)
+    return json.loads(_supabase().storage.from_(bucket).download(path))
+
 # ----------------
 # Pipeline steps
 # ----------------
@@ -111,8 +134,17 @@ def identify_speakers(event: Dict[str, Any]) -> Dict[str, Any]:
     memory = SpeakerMemory(client, aliases={})
     # Dummy mapping
     local_to_global = {"A": "alex_hormozi", "B": "guest1"}
-    # [ON HOLD] TODO: Implement per-speaker snippet extraction and call:
-    # res = memory.identify_or_enroll(local_label, wav_uri)
+    # [ON HOLD] TODO: Implement per-speaker snippet extraction, then identify them all in one request.
+    # One snippet per local speaker (typically 2-4), not per segment:
+    # labels = sorted({seg["speaker"] for seg in transcript})
+    # wav_uris = [...]  # snippet of audio_uri over each label's longest segment
+    # results = memory.identify_or_enroll_many(labels, wav_uris)
+    # local_to_global = {label: res["speaker_id_global"] for label, res in results.items()}
+    if TRANSCRIPT_BUCKET:
+        # The transcript is by far the largest field; later steps fetch it once from
+        # storage instead of it being serialized into every step's event
+        return {"episode_id": episode_id, "speaker_map": local_to_global,
+                "transcript_uri": _store_transcript(episode_id, transcript)}
     return {"episode_id": episode_id, "speaker_map": local_to_global, "transcript": transcript}
 
 def index_episode(event: Dict[str, Any]) -> Dict[str, Any]:
@@ -120,17 +152,21 @@ def index_episode(event: Dict[str, Any]) -> Dict[str, Any]:
     """
     episode_id = event["episode_id"]
     speaker_map = event["speaker_map"]
-    transcript = event["transcript"]
+    transcript = _event_transcript(event)
 
     # Persist JSON artifact and records
     sb = _supabase()
-    # Example schema: episodes (id,title), segments (episode_id,start,end,speaker_id_global,text)
+    # Schema (docs/SCHEMA/supabase.sql): episodes (id,title),
+    # segments (episode_id,start_seconds,end_seconds,speaker_global_id,text,confidence)
     # [ON HOLD] TODO: Upsert into episodes
     # sb.table("episodes").upsert({"id": episode_id, "title": "Unknown"}).execute()
-    # [ON HOLD] TODO: Upsert segments
-    # for seg in transcript:
-    #     gid = speaker_map.get(seg["speaker"], seg["speaker"])
-    #     sb.table("segments").insert({ ... }).execute()
+    # [ON HOLD] TODO: Upsert segments, one bulk insert per 500 rows (PostgREST payload limit)
+    # rather than one round-trip per segment:
+    # rows = [{"episode_id": episode_id, "start_seconds": seg["start"], "end_seconds": seg["end"],
+    #          "speaker_global_id": speaker_map.get(seg["speaker"], seg["speaker"]),
+    #          "text": seg["text"], "confidence": seg.get("confidence")} for seg in transcript]
+    # for i in range(0, len(rows), 500):
+    #     sb.table("segments").insert(rows[i:i + 500]).execute()
 
     return {"episode_id": episode_id, "status": "indexed"}
 
@@ -139,14 +175,22 @@ def export_markdown(event: Dict[str, Any]) -> Dict[str, Any]:
     Saves both transcript.json and transcript.md to artifacts directory.
     """
     episode_id = event["episode_id"]
-    transcript = event.get("transcript", {})
+    transcript = _event_transcript(event)
     speaker_map = event.get("speaker_map", {})
 
-    # Apply speaker mapping to transcript
+    # Apply speaker mapping to transcript; (global id, name) is resolved once per
+    # local speaker and reused for the rest of that speaker's segments
+    resolved: Dict[str, Tuple[str, str]] = {}
     for segment in transcript:
         local_speaker = segment.get("speaker", "unknown")
-        segment["speaker_id_global"] = speaker_map.get(local_speaker, local_speaker)
-        segment["speaker_name"] = speaker_map.get(local_speaker, f"Speaker {local_speaker}")
+        ids = resolved.get(local_speaker)
+        if ids is None:
+            if local_speaker in speaker_map:
+                ids = (speaker_map[local_speaker], speaker_map[local_speaker])
+            else:
+                ids = (local_speaker, f"Speaker {local_speaker}")
+            resolved[local_speaker] = ids
+        segment["speaker_id_global"], segment["speaker_name"] = ids
 
     # Prepare full transcript JSON
     transcript_json = {
@@ -7,12 +7,27 @@ Speaker memory client using pyannote Speaker Platform.
 """
 from __future__ import annotations
 
+import hashlib
+import json
 import os
+import random
+import socket
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, Optional, Any
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Any, Sequence, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+# orjson encodes/decodes request and response bodies faster than stdlib json (if installed)
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
 
 
 # ---------- Exceptions ----------
@@ -39,6 +54,71 @@ class HTTPConfig:
     timeout: int = 60
     max_retries: int = 3
     backoff_seconds: float = 1.5
+    pool_maxsize: int = 32
+
+
+# One keep-alive session per API key, shared by every client in the process, so
+# each identify/enroll reuses a pooled TLS connection instead of handshaking again
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose sockets also send TCP keepalives.
+
+    urllib3's defaults (TCP_NODELAY, so small JSON bodies are not held back by Nagle)
+    are kept; SO_KEEPALIVE stops idle pooled connections from being silently dropped
+    by NAT/load balancers between episodes.
+    """
+
+    SOCKET_OPTIONS = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        kwargs["socket_options"] = self.SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+
+_SESSIONS: Dict[str, requests.Session] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def _shared_session(api_key: str, pool_maxsize: int) -> requests.Session:
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(api_key)
+        if session is None:
+            session = requests.Session()
+            adapter = _KeepAliveAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            # Content-Type is left to each request: JSON bodies and multipart uploads share the session
+            session.headers.update({"Authorization": f"Bearer {api_key}"})
+            _SESSIONS[api_key] = session
+        return session
+
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _json_body(payload: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
 
 
 class SpeakerPlatformClient:
@@ -47,30 +127,39 @@ class SpeakerPlatformClient:
         if not self.api_key:
             raise ValueError("Missing PYANNOTE_API_KEY")
         self.http = http or HTTPConfig()
-        self._session = requests.Session()
-        self._session.headers.update({"Authorization": f"Bearer {self.api_key}",
-                                      "Content-Type": "application/json"})
+        self._session = _shared_session(self.api_key, self.http.pool_maxsize)
 
-    def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def _post(self, path: str, payload: Optional[Dict[str, Any]] = None,
+              files: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         url = f"{self.http.base_url}{path}"
         last_err: Optional[Exception] = None
+        # Encoded once up front, then re-sent as-is by every retry
+        body = _json_body(payload) if payload is not None else None
+        headers = _JSON_HEADERS if payload is not None else None
         for attempt in range(1, self.http.max_retries + 1):
+            retry_after: Optional[float] = None
             try:
-                resp = self._session.post(url, json=payload, timeout=self.http.timeout)
+                resp = self._session.post(url, data=body, headers=headers, files=files,
+                                          timeout=self.http.timeout)
                 if resp.status_code == 401:
                     raise SpeakerPlatformAuthError("Invalid or missing PYANNOTE_API_KEY")
                 if resp.status_code == 429:
+                    retry_after = _retry_after_seconds(resp.headers.get("Retry-After"))
                     raise SpeakerPlatformRateLimit("Rate limited by Speaker Platform")
                 if 500 <= resp.status_code < 600:
                     raise SpeakerPlatformUnavailable(f"Upstream error {resp.status_code}")
                 resp.raise_for_status()
-                return resp.json()
+                return _json_loads(resp.content)
             except (SpeakerPlatformError, requests.Timeout, requests.ConnectionError) as e:
                 last_err = e
                 if attempt == self.http.max_retries:
                     break
-                # simple exponential backoff
-                time.sleep(self.http.backoff_seconds * attempt)
+                # exponential backoff with full jitter so throttled clients don't retry in lockstep,
+                # never sooner than the server asked for
+                delay = random.uniform(0, self.http.backoff_seconds * 2 ** (attempt - 1))
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+                time.sleep(delay)
         # If we reach here, bubble the last error
         if isinstance(last_err, SpeakerPlatformError):
             raise last_err
@@ -83,6 +172,24 @@ class SpeakerPlatformClient:
         """
         return self._post("/identify", {"wav_uri": wav_uri})
 
+    def identify_batch(self, wav_uris: Sequence[str]) -> List[Dict[str, Any]]:
+        """Identify several snippets in one request.
+        Returns one identify() result per URI, in the same order.
+        """
+        data = self._post("/identify/batch", {"items": [{"wav_uri": u} for u in wav_uris]})
+        results = data.get("items") if isinstance(data, dict) else data
+        if not isinstance(results, list) or len(results) != len(wav_uris):
+            got = len(results) if isinstance(results, list) else type(results).__name__
+            raise SpeakerPlatformError(f"Batch identify returned {got} results for {len(wav_uris)} snippets")
+        return results
+
+    def upload_snippet(self, path: str) -> str:
+        """Upload a local WAV snippet once and return a URI the platform can fetch directly."""
+        with open(path, "rb") as f:
+            # Bytes rather than the file handle, so a retried attempt re-sends the whole body
+            data = self._post("/snippets", files={"wav": (os.path.basename(path), f.read(), "audio/wav")})
+        return data.get("wav_uri")
+
     def enroll(self, name: str, wav_uri: str) -> str:
         """Enroll a new speaker voiceprint and return speaker_id_global."""
         data = self._post("/enroll", {"name": name, "wav_uri": wav_uri})
@@ -90,19 +197,116 @@ class SpeakerPlatformClient:
 
 
 # ---------- Memory wrapper ----------
+# Upload/enroll calls in flight at once per SpeakerMemory; kept well under the
+# session pool size and low enough not to trip SpeakerPlatformRateLimit
+REQUEST_CONCURRENCY = 8
+
+
+def _local_path(wav_uri: str) -> Optional[str]:
+    path = wav_uri[len("file://"):] if wav_uri.startswith("file://") else wav_uri
+    return path if os.path.isfile(path) else None
+
+
+def snippet_key(wav_uri: str) -> str:
+    """Cache key for a snippet: SHA-256 of a local file's bytes, else the URI itself."""
+    path = _local_path(wav_uri)
+    if path is None:
+        return wav_uri
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 class SpeakerMemory:
     def __init__(self, client: SpeakerPlatformClient, aliases: Optional[Dict[str, str]] = None):
         self.client = client
         self.aliases = aliases or {}
+        # Settled (matched or enrolled) results by snippet_key(), so re-asking about
+        # the same snippet skips the Speaker Platform round-trip
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        # Uploaded URIs for local snippets by snippet_key(), so identify and enroll
+        # reference one upload instead of each shipping the file
+        self._uploads: Dict[str, str] = {}
 
     def identify_or_enroll(self, local_label: str, wav_uri: str, allow_enroll: bool = True) -> Dict[str, Any]:
-        res = self.client.identify(wav_uri)
-        gid = res.get("speaker_id_global")
+        key = snippet_key(wav_uri)
+        if key in self._cache:
+            return dict(self._cache[key])
+        wav_uri = self._remote_uris([wav_uri], [key])[0]
+        return self._remember(key, self._resolve(local_label, wav_uri, self.client.identify(wav_uri), allow_enroll))
+
+    def identify_or_enroll_many(self, local_labels: Sequence[str], wav_uris: Sequence[str],
+                                allow_enroll: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Like identify_or_enroll() for every label, with a single identify round-trip.
+        Local snippets are uploaded, and labels coming back "unknown" enrolled,
+        REQUEST_CONCURRENCY at a time.
+        """
+        if len(local_labels) != len(wav_uris):
+            raise ValueError(f"Got {len(wav_uris)} snippets for {len(local_labels)} speakers")
+        keys = [snippet_key(uri) for uri in wav_uris]
+        out = {label: dict(self._cache[key]) for label, key in zip(local_labels, keys) if key in self._cache}
+        pending = [(label, uri, key) for label, uri, key in zip(local_labels, wav_uris, keys) if label not in out]
+        if not pending:
+            return out
+        # Labels sharing a snippet are identified (and enrolled) once, under the first label
+        unique: Dict[str, Tuple[str, str]] = {}
+        for label, uri, key in pending:
+            unique.setdefault(key, (label, uri))
+        remote_uris = self._remote_uris([uri for _, uri in unique.values()], list(unique))
+        items = [(label, uri, key) for (key, (label, _)), uri in zip(unique.items(), remote_uris)]
+        results = self.client.identify_batch([uri for _, uri, _ in items])
+        results = [self._apply_alias(res) for res in results]
+
+        # New voices are enrolled concurrently rather than one round-trip after another
+        unknown = [(item, res) for item, res in zip(items, results)
+                   if allow_enroll and res.get("decision") == "unknown"]
+        if unknown:
+            with ThreadPoolExecutor(max_workers=min(REQUEST_CONCURRENCY, len(unknown))) as pool:
+                enrolled_ids = pool.map(self.client.enroll,
+                                        [label for (label, _, _), _ in unknown],
+                                        [uri for (_, uri, _), _ in unknown])
+                for (_, res), enrolled_id in zip(unknown, enrolled_ids):
+                    res.update({"speaker_id_global": enrolled_id, "decision": "enrolled"})
+
+        by_key = {key: self._remember(key, res) for (_, _, key), res in zip(items, results)}
+        for label, _, key in pending:
+            out[label] = dict(by_key[key])
+        return out
+
+    def _remote_uris(self, wav_uris: Sequence[str], keys: Sequence[str]) -> List[str]:
+        """Swap local snippets for uploaded URIs, uploading each new file once and concurrently."""
+        to_upload: Dict[str, str] = {}
+        for uri, key in zip(wav_uris, keys):
+            if key not in self._uploads and key not in to_upload:
+                path = _local_path(uri)
+                if path is not None:
+                    to_upload[key] = path
+        if len(to_upload) == 1:
+            key, path = next(iter(to_upload.items()))
+            self._uploads[key] = self.client.upload_snippet(path)
+        elif to_upload:
+            with ThreadPoolExecutor(max_workers=min(REQUEST_CONCURRENCY, len(to_upload))) as pool:
+                for key, uri in zip(to_upload, pool.map(self.client.upload_snippet, to_upload.values())):
+                    self._uploads[key] = uri
+        return [self._uploads.get(key, uri) for uri, key in zip(wav_uris, keys)]
+
+    def _remember(self, key: str, res: Dict[str, Any]) -> Dict[str, Any]:
+        # "unknown" is not cached so a later call with allow_enroll=True still enrolls
+        if res.get("decision") != "unknown":
+            self._cache[key] = dict(res)
+        return res
 
+    def _apply_alias(self, res: Dict[str, Any]) -> Dict[str, Any]:
         # Apply alias if we already mapped this gid
-        if gid and gid in self.aliases:
-            res["speaker_id_global"] = self.aliases[gid]
+        aliased = self.aliases.get(res.get("speaker_id_global"))
+        if aliased:
+            res["speaker_id_global"] = aliased
+        return res
 
+    def _resolve(self, local_label: str, wav_uri: str, res: Dict[str, Any], allow_enroll: bool) -> Dict[str, Any]:
+        res = self._apply_alias(res)
         if res.get("decision") == "unknown" and allow_enroll:
             enrolled_id = self.client.enroll(local_label, wav_uri)
             res.update({"speaker_id_global": enrolled_id, "decision": "enrolled"})
@@ -153,4 +153,34 @@ def test_export_markdown_from_json_function(sample_transcript, tmp_path):
     assert "episode_id: \"ep-0042\"" in markdown
     with open(output_path) as f:
         saved_content = f.read()
-    assert saved_content == markdown
\ No newline at end of file
+    assert saved_content == markdown
+
+def test_save_episodes_in_parallel(sample_transcript, tmp_path):
+    """Test saving artifacts for several episodes concurrently."""
+    exporter = MarkdownExporter(artifacts_dir=str(tmp_path))
+    items = [(f"ep-{i:04d}", dict(sample_transcript, episode_id=f"ep-{i:04d}")) for i in range(5)]
+
+    paths = exporter.save_episodes(items, max_workers=3)
+
+    assert len(paths) == 5
+    for (episode_id, _), (json_path, markdown_path) in zip(items, paths):
+        assert json_path == tmp_path / "episodes" / episode_id / "transcript.json"
+        with open(json_path) as f:
+            assert json.load(f)["episode_id"] == episode_id
+        assert f'episode_id: "{episode_id}"' in markdown_path.read_text()
+
+
+def test_export_markdown_from_json_saves_json_alongside(sample_transcript, tmp_path):
+    """Test writing the JSON artifact next to the exported Markdown."""
+    json_path = tmp_path / "test.json"
+    output_path = tmp_path / "out" / "episode.md"
+    output_path.parent.mkdir()
+
+    with open(json_path, "w") as f:
+        json.dump(sample_transcript, f)
+
+    export_markdown_from_json(str(json_path), str(output_path), save_json_alongside=True)
+
+    assert output_path.exists()
+    with open(tmp_path / "out" / "episode.json") as f:
+        assert json.load(f) == sample_transcript
@@ -1 +1,101 @@
 # RSS parsing tests
+
+import importlib.util
+import sys
+import types
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+PRD_DIR = Path(__file__).resolve().parent.parent / "docs" / "PRD"
+
+
+@dataclass
+class EpisodeMetadata:
+    guid: str
+    title: str
+    publish_date: str
+    audio_url: str
+    episode_number: object = None
+    description: str = ""
+    duration: object = None
+
+
+@pytest.fixture(scope="module")
+def rss_processor():
+    """Load docs/PRD/rss_processor.py with the askthegame utils it imports."""
+    pytest.importorskip("feedparser")
+    pytest.importorskip("dateutil")
+
+    package = "prd_snapshot"
+    modules = {
+        package: types.ModuleType(package),
+        f"{package}.audio": types.ModuleType(f"{package}.audio"),
+        f"{package}.utils": types.ModuleType(f"{package}.utils"),
+        f"{package}.utils.models": types.ModuleType(f"{package}.utils.models"),
+        f"{package}.utils.config": types.ModuleType(f"{package}.utils.config"),
+    }
+    for module in modules.values():
+        module.__path__ = []
+    modules[f"{package}.utils.models"].EpisodeMetadata = EpisodeMetadata
+    modules[f"{package}.utils.config"].config = types.SimpleNamespace(
+        load_pipeline_config=lambda: {"rerun_keywords": []}
+    )
+    saved = {name: sys.modules.get(name) for name in modules}
+    sys.modules.update(modules)
+
+    def load(name, filename):
+        spec = importlib.util.spec_from_file_location(
+            f"{package}.{name}", PRD_DIR / filename
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+        return module
+
+    load("utils.guid_normalizer", "guid_normalizer.py")
+    yield load("audio.rss_processor", "rss_processor.py")
+
+    for name in [
+        *modules,
+        f"{package}.utils.guid_normalizer",
+        f"{package}.audio.rss_processor",
+    ]:
+        sys.modules.pop(name, None)
+    sys.modules.update(
+        {name: module for name, module in saved.items() if module is not None}
+    )
+
+
+def test_parse_publish_date_known_abbreviation(rss_processor):
+    assert (
+        rss_processor.parse_publish_date("Mon, 01 Jul 2024 08:00:00 PDT")
+        == "2024-07-01T08:00:00-07:00"
+    )
+
+
+def test_parse_publish_date_unknown_abbreviation_keeps_raw(rss_processor):
+    raw = "Mon, 01 Jul 2024 08:00:00 BST"
+    assert rss_processor.parse_publish_date(raw) == raw
+    assert rss_processor.parse_publish_date("not a date") == "not a date"
+
+
+def test_unknown_timezone_keeps_episode(rss_processor, tmp_path):
+    feed = tmp_path / "feed.xml"
+    feed.write_text(
+        '<?xml version="1.0"?><rss version="2.0"><channel><title>The Game</title>'
+        "<item><guid>0f8fad5b-d9cb-469f-a165-70867728950e</guid><title>Ep 12 Sales</title>"
+        "<pubDate>Mon, 01 Jul 2024 08:00:00 BST</pubDate>"
+        '<enclosure url="https://cdn.example.com/ep12.mp3" type="audio/mpeg" length="1"/>'
+        "</item></channel></rss>"
+    )
+    episodes = rss_processor.RSSProcessor().fetch_episodes(str(feed))
+    assert len(episodes) == 1
+    assert episodes[0].publish_date == "Mon, 01 Jul 2024 08:00:00 BST"
+
+
+def test_unreachable_feed_returns_no_episodes(rss_processor, tmp_path):
+    processor = rss_processor.RSSProcessor()
+    assert processor.fetch_episodes((tmp_path / "missing.xml").as_uri()) == []
+    assert processor.fetch_episodes("http://127.0.0.1:9/feed.xml") == []
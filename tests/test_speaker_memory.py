@@ -1,17 +1,35 @@
 # tests/test_speaker_memory.py
 
+import json
+import os
+
 import pytest
-from src.pipeline.speaker_id_service import SpeakerMemory, SpeakerPlatformClient
+from src.pipeline import speaker_id_service
+from src.pipeline.speaker_id_service import (
+    HTTPConfig,
+    SpeakerMemory,
+    SpeakerPlatformClient,
+    SpeakerPlatformError,
+)
 
 
 class DummyClient:
     """Mocked pyannote Speaker Platform client."""
 
     def identify(self, wav_uri: str):
+        self.identify_calls = getattr(self, "identify_calls", 0) + 1
         if "alex" in wav_uri:
             return {"speaker_id_global": "alex_hormozi", "score": 0.95, "decision": "match"}
         return {"speaker_id_global": None, "score": 0.0, "decision": "unknown"}
 
+    def identify_batch(self, wav_uris):
+        self.batch_calls = getattr(self, "batch_calls", 0) + 1
+        return [self.identify(u) for u in wav_uris]
+
+    def upload_snippet(self, path: str):
+        self.__dict__.setdefault("uploaded", []).append(path)  # atomic; uploads may run in threads
+        return f"https://snippets.example/{os.path.basename(path)}"
+
     def enroll(self, name: str, wav_uri: str):
         return f"{name.lower()}_enrolled"
 
@@ -37,4 +55,121 @@ def test_alias_override():
     aliases = {"alex_hormozi": "alex"}
     memory = SpeakerMemory(client, aliases=aliases)
     res = memory.identify_or_enroll("Alex", "file://alex_clip.wav")
-    assert res["speaker_id_global"] == "alex"  # alias applied
\ No newline at end of file
+    assert res["speaker_id_global"] == "alex"  # alias applied
+
+def test_identify_or_enroll_many_single_round_trip():
+    client = DummyClient()
+    memory = SpeakerMemory(client, aliases={"alex_hormozi": "alex"})
+    res = memory.identify_or_enroll_many(["A", "Guest1"], ["file://alex_clip.wav", "file://guest_clip.wav"])
+    assert client.batch_calls == 1
+    assert res["A"]["speaker_id_global"] == "alex"
+    assert res["Guest1"] == {"speaker_id_global": "guest1_enrolled", "score": 0.0, "decision": "enrolled"}
+
+
+def test_identify_or_enroll_many_enrolls_each_unknown():
+    client = DummyClient()
+    memory = SpeakerMemory(client)
+    labels = [f"Guest{i}" for i in range(5)]
+    res = memory.identify_or_enroll_many(labels, [f"file://guest_{i}.wav" for i in range(5)])
+    assert [res[label]["speaker_id_global"] for label in labels] == [f"guest{i}_enrolled" for i in range(5)]
+    assert all(r["decision"] == "enrolled" for r in res.values())
+
+
+def test_identify_results_cached_by_snippet_content(tmp_path):
+    client = DummyClient()
+    memory = SpeakerMemory(client)
+    first = tmp_path / "alex_1.wav"
+    second = tmp_path / "alex_2.wav"
+    first.write_bytes(b"RIFF same audio")
+    second.write_bytes(b"RIFF same audio")
+
+    memory.identify_or_enroll("A", f"file://{first}")
+    res = memory.identify_or_enroll("A", str(second))
+    assert client.identify_calls == 1
+    assert len(client.uploaded) == 1
+    assert res["speaker_id_global"] == "alex_hormozi"
+
+
+def test_local_snippet_uploaded_once_for_identify_and_enroll(tmp_path):
+    client = DummyClient()
+    enrolled = []
+    client.enroll = lambda name, wav_uri: enrolled.append(wav_uri) or "guest_enrolled"
+    memory = SpeakerMemory(client)
+    snippet = tmp_path / "guest.wav"
+    snippet.write_bytes(b"RIFF guest audio")
+
+    res = memory.identify_or_enroll("Guest", str(snippet))
+    assert res["decision"] == "enrolled"
+    assert len(client.uploaded) == 1
+    assert enrolled == ["https://snippets.example/guest.wav"]
+
+
+def test_identify_or_enroll_many_uploads_each_distinct_snippet_once(tmp_path):
+    client = DummyClient()
+    memory = SpeakerMemory(client)
+    uris = []
+    for name, audio in [("alex_a.wav", b"RIFF alex"), ("alex_b.wav", b"RIFF alex"), ("guest.wav", b"RIFF guest")]:
+        (tmp_path / name).write_bytes(audio)
+        uris.append(str(tmp_path / name))
+
+    res = memory.identify_or_enroll_many(["A", "A2", "G"], uris)
+    assert len(client.uploaded) == 2
+    assert res["A"]["speaker_id_global"] == "alex_hormozi"
+    assert res["G"]["decision"] == "enrolled"
+
+
+def test_identify_or_enroll_many_dedupes_shared_snippets():
+    client = DummyClient()
+    enrolled = []
+    client.enroll = lambda name, wav_uri: enrolled.append(name) or f"{name.lower()}_enrolled"
+    client.identify_batch = lambda uris: enrolled.append(list(uris)) or [client.identify(u) for u in uris]
+    memory = SpeakerMemory(client)
+
+    res = memory.identify_or_enroll_many(["G1", "G2"], ["file://guest.wav", "file://guest.wav"])
+    assert enrolled == [["file://guest.wav"], "G1"]
+    assert res["G1"] == res["G2"]
+    assert res["G2"]["speaker_id_global"] == "g1_enrolled"
+
+
+def test_clients_share_session_per_api_key():
+    a = SpeakerPlatformClient(api_key="key-a")
+    b = SpeakerPlatformClient(api_key="key-a")
+    c = SpeakerPlatformClient(api_key="key-b")
+    assert a._session is b._session
+    assert a._session is not c._session
+    assert c._session.headers["Authorization"] == "Bearer key-b"
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    @property
+    def content(self):
+        return json.dumps(self._payload).encode()
+
+
+def test_rate_limited_post_honors_retry_after(monkeypatch):
+    client = SpeakerPlatformClient(api_key="key-retry", http=HTTPConfig(backoff_seconds=0.01))
+    responses = [FakeResponse(429, headers={"Retry-After": "2"}),
+                 FakeResponse(200, {"decision": "match"})]
+    monkeypatch.setattr(client._session, "post", lambda *a, **kw: responses.pop(0))
+    sleeps = []
+    monkeypatch.setattr(speaker_id_service.time, "sleep", sleeps.append)
+
+    assert client.identify("file://clip.wav") == {"decision": "match"}
+    assert sleeps == [2.0]
+
+
+@pytest.mark.parametrize("payload", [[{"decision": "match"}], {"items": [{"decision": "match"}]}, {}])
+def test_identify_batch_rejects_short_response(monkeypatch, payload):
+    client = SpeakerPlatformClient(api_key="key-batch")
+    monkeypatch.setattr(client._session, "post", lambda *a, **kw: FakeResponse(200, payload))
+
+    with pytest.raises(SpeakerPlatformError):
+        client.identify_batch(["file://a.wav", "file://b.wav"])